@@ -1,5 +1,3 @@
-import copy
-
 from manim import *
 from src.components import *
 from src.algorithms import *
@@ -1082,6 +1080,7 @@ class OS(CustomMovingCameraScene):
                 MultiLevelQueue(quantum=5),
             ],
             stepsize=stepsize_linechart,
+            checkpointed=True,
         )
         titles = ["FCFS", "RoundRobin", "MLQ"]
         metric_response_time = MetricResponseTime(
@@ -1120,20 +1119,20 @@ class OS(CustomMovingCameraScene):
 
         fcfs_algo = FirstComeFirstServe()
         fcfs_scheduler = Scheduler()
-        fcfs_scheduler.set_processes(copy.deepcopy(processes))
-        fcfs_scheduler.run_algorithm(fcfs_algo, display=True)
+        fcfs_scheduler.set_processes(processes)
+        fcfs_scheduler.run_algorithm(fcfs_algo, display=True, record_trace=False)
         fcfs_metrics = fcfs_scheduler.get_metrics()
 
         rr_algo = RoundRobin(quantum=5)
         rr_scheduler = Scheduler()
-        rr_scheduler.set_processes(copy.deepcopy(processes))
-        rr_scheduler.run_algorithm(rr_algo, display=True)
+        rr_scheduler.set_processes(processes)
+        rr_scheduler.run_algorithm(rr_algo, display=True, record_trace=False)
         rr_metrics = rr_scheduler.get_metrics()
 
         mlq_algo = MultiLevelQueue(quantum=5)
         mlq_scheduler = Scheduler()
-        mlq_scheduler.set_processes(copy.deepcopy(processes))
-        mlq_scheduler.run_algorithm(mlq_algo, display=True)
+        mlq_scheduler.set_processes(processes)
+        mlq_scheduler.run_algorithm(mlq_algo, display=True, record_trace=False)
         mlq_metrics = mlq_scheduler.get_metrics()
 
         # 1st BarChart metric
@@ -1,49 +1,245 @@
 import copy
+import heapq
+import inspect
 import random
 import numpy as np
 import manim
 
-from typing import Tuple, List
+from collections import deque
+from typing import Tuple, List, Optional, Sequence, Union
 from abc import ABC, abstractmethod
 
+from .cache import default_cache
+from .engines import (
+    FirstComeFirstServeEngine,
+    MultiLevelQueueEngine,
+    RoundRobinEngine,
+    WaitTimes,
+    completion_metrics,
+    fcfs_vectorized,
+    reject_io_bursts,
+    run_engine,
+    run_prefixes,
+    with_switch_overhead,
+)
+from .events import (
+    FirstComeFirstServePolicy,
+    MultiLevelQueuePolicy,
+    RoundRobinPolicy,
+    run_events,
+)
+from .incremental import IncrementalRun
+from .metrics import StreamingMetrics
+from .trace import SWITCH_OVERHEAD_ID, ScheduleTrace
+from .workload import (
+    PRIORITY_HIGH,
+    ProcessTable,
+    SequenceDiagrammProcess,
+    as_process_table,
+    has_io_bursts,
+)
+
 np.random.seed(1)
 random.seed(1)
 
-
-class SequenceDiagrammProcess:
-    def __init__(
-        self, id: int, arrival_time: int, burst_time: int, priority: str = "low"
-    ) -> None:
-        self.id = id
-        self.arrival_time = arrival_time
-        self.burst_time = burst_time
-        self.priority = priority
+# CFS weights by priority code, nice 0 and nice -5 of the Linux weight table
+NICE_0_WEIGHT = 1024
+PRIORITY_WEIGHTS = (NICE_0_WEIGHT, 3121)
 
 
 class Algorithm(ABC):
-    def __init__(self, name) -> None:
+    # Engines selectable in Scheduler.run_algorithm, mapped to the method implementing them
+    engines = {"reference": "schedule"}
+    fastest_engine = "reference"
+    # Whether a run is fully described by its metrics and trace, see cache.ResultCache
+    cacheable = True
+    # Whether create_engine returns a resumable engine, see incremental.IncrementalRun
+    resumable = False
+
+    def __init__(self, name, switch_cost: int = 0) -> None:
         self.name = name
-        self.__steps = []
+        self.switch_cost = switch_cost  # CPU time every context switch takes
+        self.record_trace = True
+        self.sink = None  # Gets every completion of a run, see engines.WaitTimes
+        self.__trace = ScheduleTrace()
 
     def add_step(self, id: int, start: int, size: int) -> None:
-        self.__steps.append({"id": id, "start": start, "size": size})
+        if self.record_trace:
+            self.__trace.append(id, start, size)
+
+    def add_steps(self, ids: np.ndarray, starts: np.ndarray, sizes: np.ndarray) -> None:
+        if self.record_trace:
+            self.__trace.extend(ids, starts, sizes)
+
+    def reset(self) -> None:
+        self.__trace.clear()
+
+    def trace_mark(self) -> tuple:
+        return self.__trace.mark()
+
+    def truncate_trace(self, mark: tuple) -> None:
+        # Continues the trace from an earlier trace_mark, see incremental
+        self.__trace.truncate(mark)
+
+    def _parameter_names(self) -> List[str]:
+        return list(inspect.signature(type(self).__init__).parameters)[1:]
+
+    def keeps_parameters(self) -> bool:
+        """Whether every constructor argument can be read back by parameters()"""
+        return all(hasattr(self, name) for name in self._parameter_names())
+
+    def parameters(self) -> dict:
+        """
+        Constructor arguments, read back from the attributes of the same name. They are
+        part of the cache key, so a missing attribute is an error instead of a key
+        that ignores the argument (see keeps_parameters).
+        """
+        names = self._parameter_names()
+        missing = [name for name in names if not hasattr(self, name)]
+        if missing:
+            raise AttributeError(
+                f"{type(self).__name__} does not keep the constructor arguments "
+                f"{missing} as attributes"
+            )
+        return {name: getattr(self, name) for name in names}
+
+    def clone(self) -> "Algorithm":
+        """Copy with the same configuration, an empty trace and no sink"""
+        clone = copy.copy(self)
+        clone.sink = None
+        clone.__trace = ScheduleTrace()
+        return clone
+
+    def switch(self, current_time: int) -> int:
+        """
+        Spends the switch cost before the slice of a newly dispatched process, recorded
+        as an overhead segment. Returns the time the slice starts.
+        """
+        if not self.switch_cost:
+            return current_time
+        self.add_step(SWITCH_OVERHEAD_ID, current_time, self.switch_cost)
+        return current_time + self.switch_cost
+
+    def overhead_time(self, context_switches: int) -> int:
+        # CPU time of a run spent on switching instead of on the processes
+        return context_switches * self.switch_cost
+
+    def work_bounds(self, processes: ProcessTable) -> Optional[np.ndarray]:
+        """
+        Upper bound of the CPU time every process takes, switch overhead included.
+        Algorithms returning it keep no state across idle time, so the busy periods of
+        their schedules can be run independently (see busy_periods).
+        """
+        return None
 
     @abstractmethod
     def schedule(self, processes):
         pass
 
+    def run(
+        self,
+        processes,
+        engine: str = "reference",
+        record_trace: bool = True,
+        sink=None,
+    ):
+        if engine not in self.engines:
+            raise ValueError(
+                f"{self.name} has no engine '{engine}', choose one of {sorted(self.engines)}"
+            )
+        if engine != "io" and has_io_bursts(processes):
+            # Every other engine runs each process as one CPU burst and drops the I/O
+            raise ValueError(
+                f"{self.name} follows the I/O bursts of a workload only with the 'io' "
+                "engine"
+                if "io" in self.engines
+                else f"{self.name} cannot schedule a workload with I/O bursts"
+            )
+
+        # Every run starts from a clean trace, without a trace only the metrics are kept
+        self.reset()
+        self.record_trace = record_trace
+        self.sink = sink
+        return getattr(self, self.engines[engine])(processes)
+
+    def engine_for(self, processes) -> str:
+        """Fastest engine for a workload, the "io" engine if it has I/O bursts"""
+        if "io" in self.engines and has_io_bursts(processes):
+            return "io"
+        return self.fastest_engine
+
+    def run_prefixes(self, processes, sizes: List[int], statistics: bool = False):
+        """
+        Yields (context_switches, current_time, wait_times) for each prefix of the
+        workload with a length in `sizes` (increasing), without recording a trace.
+        With statistics every result also has the StreamingMetrics of the prefix.
+        Algorithms with a resumable engine override this to do a single pass.
+        """
+        for size in sizes:
+            metrics = StreamingMetrics() if statistics else None
+            result = self.run(processes[:size], record_trace=False, sink=metrics)
+            yield (*result, metrics) if statistics else result
+
+    def create_engine(self, add_step=None, sink=None):
+        """
+        Resumable engine taking the workload in chunks (see engines.RoundRobinEngine),
+        used for checkpointed and streaming runs.
+        """
+        raise NotImplementedError(f"{self.name} has no resumable engine")
+
+    def _step_recorder(self):
+        # Engines skip recording entirely when they get no callback
+        return self.add_step if self.record_trace else None
+
+    def _schedule_with_engine(self, processes) -> Tuple[int, int, np.ndarray]:
+        # Wait times are indexed by the position of the process in the workload
+        table = as_process_table(processes)
+        wait_times = WaitTimes(len(table), forward=self.sink)
+        engine = self.create_engine(self._step_recorder(), wait_times)
+        run_engine(engine, table)
+        return engine.context_switches, engine.current_time, wait_times.values
+
+    def _schedule_with_events(self, processes, policy) -> Tuple[int, int, np.ndarray]:
+        # The only engine following the I/O bursts of a workload, see events.run_events
+        table = as_process_table(processes)
+        wait_times = WaitTimes(len(table), forward=self.sink)
+        context_switches, current_time = run_events(
+            table, policy, self._step_recorder(), wait_times, self.switch_cost
+        )
+        return context_switches, current_time, wait_times.values
+
+    def _engine_prefixes(self, processes, sizes: List[int], statistics: bool = False):
+        self.reset()
+        table = as_process_table(processes)
+        wait_times = WaitTimes(len(table), keep_response_times=statistics)
+        engine = self.create_engine(sink=wait_times)
+        return run_prefixes(engine, table, sizes, wait_times, statistics)
+
+    def _report_completions(
+        self, processes, wait_times, response_times, by_id: bool = False
+    ) -> None:
+        # Runs without an engine hand all completions to the sink at the end
+        if self.sink is None:
+            return
+
+        table = as_process_table(processes)
+        wait_times = np.asarray(wait_times, dtype=np.int64)
+        response_times = np.asarray(response_times, dtype=np.int64)
+        if by_id:
+            # The reference loops keep their lists indexed by process id
+            wait_times = wait_times[table.ids - 1]
+            response_times = response_times[table.ids - 1]
+        self.sink.complete_many(
+            np.arange(len(table)), wait_times, table.burst_times, response_times
+        )
+
     def get_steps(self):
-        combined = []
-        for step in self.__steps:
-            if (
-                combined
-                and step["id"] == combined[-1]["id"]
-                and step["start"] == combined[-1]["start"] + combined[-1]["size"]
-            ):
-                combined[-1]["size"] += step["size"]
-            else:
-                combined.append(step.copy())
-        return combined
+        # Contiguous steps of the same process are already merged by the trace
+        return self.__trace.to_steps()
+
+    def get_trace(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # Read-only (ids, starts, sizes) arrays of the merged steps
+        return self.__trace.view()
 
 
 class FirstComeFirstServe(Algorithm):
@@ -51,8 +247,16 @@ class FirstComeFirstServe(Algorithm):
     processes must be sorted by arrival time
     """
 
-    def __init__(self) -> None:
-        super().__init__("FCFS")
+    engines = {
+        **Algorithm.engines,
+        "vectorized": "schedule_vectorized",
+        "io": "schedule_io",
+    }
+    fastest_engine = "vectorized"
+    resumable = True
+
+    def __init__(self, switch_cost: int = 0) -> None:
+        super().__init__("FCFS", switch_cost)
 
     def schedule(self, processes) -> Tuple[int, int, int]:
         current_time = 0
@@ -65,6 +269,7 @@ class FirstComeFirstServe(Algorithm):
             # Only for edge case when the first process arrives after 0
             if current_time < process.arrival_time:
                 current_time = process.arrival_time
+            current_time = self.switch(current_time)
 
             # Wait time is just the difference between the current time and the arrival time
             wait_times.append(current_time - process.arrival_time)
@@ -72,16 +277,71 @@ class FirstComeFirstServe(Algorithm):
 
             current_time += process.burst_time  # Execution until the end
 
+        # A FCFS process runs once, so it responds when its wait ends
+        self._report_completions(processes, wait_times, wait_times)
         return context_switches, current_time, wait_times
 
+    def schedule_vectorized(self, processes) -> Tuple[int, int, np.ndarray]:
+        table = as_process_table(processes)
+
+        start_times, wait_times, current_time, context_switches = fcfs_vectorized(
+            table.arrival_times, table.burst_times, switch_cost=self.switch_cost
+        )
+        self.add_steps(
+            *with_switch_overhead(
+                table.ids, start_times, table.burst_times, self.switch_cost
+            )
+        )
+        self._report_completions(table, wait_times, wait_times)
+
+        return context_switches, current_time, wait_times
+
+    def schedule_io(self, processes) -> Tuple[int, int, np.ndarray]:
+        return self._schedule_with_events(processes, FirstComeFirstServePolicy())
+
+    def work_bounds(self, processes: ProcessTable) -> np.ndarray:
+        # Every process is dispatched exactly once
+        return processes.burst_times + self.switch_cost
+
+    def run_prefixes(self, processes, sizes: List[int], statistics: bool = False):
+        # A FCFS prefix is never influenced by later processes, so one run covers all
+        self.reset()
+        table = as_process_table(processes)
+        reject_io_bursts(table)
+        start_times, wait_times, _, _ = fcfs_vectorized(
+            table.arrival_times, table.burst_times, switch_cost=self.switch_cost
+        )
+        for size in sizes:
+            current_time = 0
+            if size:
+                current_time = int(start_times[size - 1] + table.burst_times[size - 1])
+            result = (size, current_time, wait_times[:size])
+            if statistics:
+                # Waiting ends with the only slice, so the response time is the wait
+                result += (
+                    completion_metrics(
+                        wait_times[:size], table.burst_times[:size], wait_times[:size]
+                    ),
+                )
+            yield result
+
+    def create_engine(self, add_step=None, sink=None) -> FirstComeFirstServeEngine:
+        return FirstComeFirstServeEngine(
+            add_step=add_step, sink=sink, switch_cost=self.switch_cost
+        )
+
 
 class RoundRobin(Algorithm):
     """
     processes must be sorted by arrival time
     """
 
-    def __init__(self, quantum: int) -> None:
-        super().__init__("RoundRobin")
+    engines = {**Algorithm.engines, "event": "schedule_events", "io": "schedule_io"}
+    fastest_engine = "event"
+    resumable = True
+
+    def __init__(self, quantum: int, switch_cost: int = 0) -> None:
+        super().__init__("RoundRobin", switch_cost)
 
         self.quantum = quantum
 
@@ -92,38 +352,46 @@ class RoundRobin(Algorithm):
         context_switches = 0
 
         wait_times = [0] * len(processes)
+        response_times = [-1] * len(processes)  # Wait until the first slice
         last_end_times = {process.id: process.arrival_time for process in processes}
 
-        process_queue = copy.deepcopy(processes)
+        # Remaining burst times are tracked here so the workload is never modified
+        remaining_times = {process.id: process.burst_time for process in processes}
+        process_queue = list(processes)
 
         last_process_id = -1
         while process_queue:
             current_process = process_queue.pop(0)
 
+            # Only for edge case when the first process arrives after 0
+            if current_time < current_process.arrival_time:
+                current_time = current_process.arrival_time
+
             # Only count context switches if the process is different
             if last_process_id != current_process.id:
                 last_process_id = current_process.id
                 context_switches += 1
+                current_time = self.switch(current_time)
 
-            # Only for edge case when the first process arrives after 0
-            if current_time < current_process.arrival_time:
-                current_time = current_process.arrival_time
-
-            execution_time = min(current_process.burst_time, self.quantum)
+            execution_time = min(remaining_times[current_process.id], self.quantum)
             self.add_step(current_process.id, current_time, execution_time)
 
             # Update wait times
             wait_times[current_process.id - 1] += (
                 current_time - last_end_times[current_process.id]
             )
+            if response_times[current_process.id - 1] < 0:
+                response_times[current_process.id - 1] = wait_times[
+                    current_process.id - 1
+                ]
             last_end_times[current_process.id] = current_time + execution_time
 
             # Update times
-            current_process.burst_time -= execution_time
+            remaining_times[current_process.id] -= execution_time
             current_time += execution_time
 
             # Prepare for next iteration
-            if current_process.burst_time > 0:
+            if remaining_times[current_process.id] > 0:
                 inserted = False
                 for i in range(len(process_queue)):
                     if process_queue[i].arrival_time > current_time:
@@ -133,16 +401,44 @@ class RoundRobin(Algorithm):
                 if not inserted:
                     process_queue.append(current_process)
 
+        self._report_completions(processes, wait_times, response_times, by_id=True)
         return context_switches, current_time, wait_times
 
+    def schedule_events(
+        self, processes: Union[ProcessTable, List[SequenceDiagrammProcess]]
+    ) -> Tuple[int, int, np.ndarray]:
+        return self._schedule_with_engine(processes)
+
+    def schedule_io(self, processes) -> Tuple[int, int, np.ndarray]:
+        return self._schedule_with_events(processes, RoundRobinPolicy(self.quantum))
+
+    def work_bounds(self, processes: ProcessTable) -> np.ndarray:
+        # At most one switch per quantum
+        quanta = -(-processes.burst_times // self.quantum)
+        return processes.burst_times + quanta * self.switch_cost
+
+    def run_prefixes(self, processes, sizes: List[int], statistics: bool = False):
+        return self._engine_prefixes(processes, sizes, statistics)
+
+    def create_engine(self, add_step=None, sink=None) -> RoundRobinEngine:
+        return RoundRobinEngine(
+            self.quantum, add_step=add_step, sink=sink, switch_cost=self.switch_cost
+        )
+
 
 class MultiLevelQueue(Algorithm):
-    def __init__(self, quantum: int) -> None:
-        super().__init__("MLQ")
+    engines = {**Algorithm.engines, "event": "schedule_events", "io": "schedule_io"}
+    fastest_engine = "event"
+    resumable = True
+
+    def __init__(self, quantum: int, switch_cost: int = 0) -> None:
+        super().__init__("MLQ", switch_cost)
         self.quantum = quantum
 
     def schedule(self, processes) -> Tuple[int, int, int]:
-        _processes = copy.deepcopy(processes)
+        # Remaining burst times are tracked here so the workload is never modified
+        _processes = list(processes)
+        remaining_times = {process.id: process.burst_time for process in _processes}
 
         high_priority = [p for p in _processes if p.priority == "high"]
         low_priority = [p for p in _processes if p.priority == "low"]
@@ -150,6 +446,7 @@ class MultiLevelQueue(Algorithm):
         current_time = 0
         context_switches = 0
         wait_times = [0] * len(_processes)
+        response_times = [-1] * len(_processes)  # Wait until the first slice
         last_end_times = {process.id: process.arrival_time for process in _processes}
 
         last_process_id = -1
@@ -167,23 +464,28 @@ class MultiLevelQueue(Algorithm):
                     if last_process_id != next_process.id:
                         last_process_id = next_process.id
                         context_switches += 1
+                        current_time = self.switch(current_time)
 
                     # Get the minimum between the burst time and the quantum. Update the burst time
-                    execution_time = min(next_process.burst_time, self.quantum)
-                    next_process.burst_time -= execution_time
+                    execution_time = min(remaining_times[next_process.id], self.quantum)
+                    remaining_times[next_process.id] -= execution_time
 
                     # Update metrics
                     self.add_step(next_process.id, current_time, execution_time)
                     wait_times[next_process.id - 1] += (
                         current_time - last_end_times[next_process.id]
                     )
+                    if response_times[next_process.id - 1] < 0:
+                        response_times[next_process.id - 1] = wait_times[
+                            next_process.id - 1
+                        ]
                     last_end_times[next_process.id] = current_time + execution_time
 
                     # Update times
                     current_time += execution_time
 
                     # Prepare for next iteration
-                    if next_process.burst_time > 0:
+                    if remaining_times[next_process.id] > 0:
                         inserted = False
                         for i in range(len(high_priority)):
                             if high_priority[i].arrival_time > current_time:
@@ -199,66 +501,529 @@ class MultiLevelQueue(Algorithm):
                     if last_process_id != next_process.id:
                         last_process_id = next_process.id
                         context_switches += 1
+                        current_time = self.switch(current_time)
 
                     # Also use the minimum time unit. Reason for this is that we have to check if there will be a high-priority process arriving
-                    execution_time = min(next_process.burst_time, 1)
-                    next_process.burst_time -= execution_time
+                    execution_time = min(remaining_times[next_process.id], 1)
+                    remaining_times[next_process.id] -= execution_time
 
                     # Update metrics
                     self.add_step(next_process.id, current_time, execution_time)
                     wait_times[next_process.id - 1] += (
                         current_time - last_end_times[next_process.id]
                     )
+                    if response_times[next_process.id - 1] < 0:
+                        response_times[next_process.id - 1] = wait_times[
+                            next_process.id - 1
+                        ]
                     last_end_times[next_process.id] = current_time + execution_time
 
                     # Update times
                     current_time += execution_time
 
                     # Prepare for next iteration
-                    if next_process.burst_time > 0:
+                    if remaining_times[next_process.id] > 0:
                         low_priority.insert(0, next_process)
             else:
                 current_time += 1
 
+        self._report_completions(_processes, wait_times, response_times, by_id=True)
         return context_switches, current_time, wait_times
 
+    def schedule_events(self, processes) -> Tuple[int, int, np.ndarray]:
+        return self._schedule_with_engine(processes)
+
+    def schedule_io(self, processes) -> Tuple[int, int, np.ndarray]:
+        return self._schedule_with_events(
+            processes, MultiLevelQueuePolicy(self.quantum)
+        )
+
+    def work_bounds(self, processes: ProcessTable) -> np.ndarray:
+        # A low priority process is dispatched once plus once more after every
+        # preemption, and every high priority arrival preempts at most once
+        quanta = -(-processes.burst_times // self.quantum)
+        switches = np.where(processes.priorities == PRIORITY_HIGH, quanta + 1, 1)
+        return processes.burst_times + switches * self.switch_cost
+
+    def run_prefixes(self, processes, sizes: List[int], statistics: bool = False):
+        return self._engine_prefixes(processes, sizes, statistics)
+
+    def create_engine(self, add_step=None, sink=None) -> MultiLevelQueueEngine:
+        return MultiLevelQueueEngine(
+            self.quantum, add_step=add_step, sink=sink, switch_cost=self.switch_cost
+        )
+
+
+class MultiLevelFeedbackQueue(Algorithm):
+    """
+    Feedback queue with one round robin level per quantum in `quanta`, level 0 first.
+    New processes enter level 0 and a process that uses up the quantum of its level
+    moves one level down. An arrival preempts a process on a lower level, which keeps
+    the rest of its quantum at the head of its level. Every `boost_interval` all
+    processes are moved back to level 0 (checked between slices).
+
+    Non-empty levels are kept as bits of an integer, so the next level is found in
+    constant time like in the Linux O(1) scheduler.
+    """
+
+    def __init__(
+        self,
+        quanta: Sequence[int] = (8, 16, 32),
+        boost_interval: Optional[int] = None,
+        switch_cost: int = 0,
+    ) -> None:
+        super().__init__("MLFQ", switch_cost)
+        self.quanta = tuple(quanta)
+        self.boost_interval = boost_interval
+
+    def schedule(self, processes) -> Tuple[int, int, np.ndarray]:
+        table = as_process_table(processes)
+        ids = table.ids.tolist()
+        arrival_times = table.arrival_times.tolist()
+        burst_times = table.burst_times.tolist()
+        arrival_order = np.argsort(table.arrival_times, kind="stable").tolist()
+
+        quanta = self.quanta
+        lowest_level = len(quanta) - 1
+        queues = [deque() for _ in quanta]
+        bitmap = 0  # Bit i is set while level i has processes
+
+        current_time = 0
+        context_switches = 0
+        wait_times = [0] * len(table)
+        response_times = [-1] * len(table)  # Wait until the first slice
+        remaining_times = list(burst_times)
+        used_quanta = [0] * len(table)  # Time used of the quantum on the current level
+
+        next_boost = self.boost_interval
+        next_arrival = 0
+        last_row = -1
+        while next_arrival < len(arrival_order) or bitmap:
+            # Only for edge case when nothing is ready until the next arrival
+            if not bitmap:
+                current_time = max(
+                    current_time, arrival_times[arrival_order[next_arrival]]
+                )
+
+            while (
+                next_arrival < len(arrival_order)
+                and arrival_times[arrival_order[next_arrival]] <= current_time
+            ):
+                queues[0].append(arrival_order[next_arrival])
+                bitmap |= 1
+                next_arrival += 1
+
+            if next_boost is not None and current_time >= next_boost:
+                boosted = deque()
+                for queue in queues:
+                    for row in queue:
+                        used_quanta[row] = 0
+                    boosted.extend(queue)
+                    queue.clear()
+                queues[0] = boosted
+                bitmap = 1
+                next_boost = (
+                    current_time // self.boost_interval + 1
+                ) * self.boost_interval
+
+            # Lowest set bit is the highest non-empty level
+            level = (bitmap & -bitmap).bit_length() - 1
+            queue = queues[level]
+            row = queue.popleft()
+            if not queue:
+                bitmap &= ~(1 << level)
+
+            # Only count context switches if the process is different
+            if last_row != row:
+                last_row = row
+                context_switches += 1
+                current_time = self.switch(current_time)
+            if response_times[row] < 0:
+                response_times[row] = current_time - arrival_times[row]
+
+            # Below level 0 the next arrival preempts the process, after at least one
+            # unit if it arrived during the switch
+            execution_time = min(remaining_times[row], quanta[level] - used_quanta[row])
+            if level and next_arrival < len(arrival_order):
+                execution_time = min(
+                    execution_time,
+                    max(arrival_times[arrival_order[next_arrival]] - current_time, 1),
+                )
+            self.add_step(ids[row], current_time, execution_time)
+
+            current_time += execution_time
+            remaining_times[row] -= execution_time
+            used_quanta[row] += execution_time
+
+            if remaining_times[row] == 0:
+                wait_times[row] = current_time - arrival_times[row] - burst_times[row]
+                continue
+
+            # Arrivals until now are queued before the process is requeued
+            while (
+                next_arrival < len(arrival_order)
+                and arrival_times[arrival_order[next_arrival]] <= current_time
+            ):
+                queues[0].append(arrival_order[next_arrival])
+                bitmap |= 1
+                next_arrival += 1
+
+            if used_quanta[row] == quanta[level]:
+                level = min(level + 1, lowest_level)
+                used_quanta[row] = 0
+                queues[level].append(row)
+            else:
+                queues[level].appendleft(row)
+            bitmap |= 1 << level
+
+        wait_times = np.array(wait_times, dtype=np.int64)
+        self._report_completions(table, wait_times, response_times)
+        return context_switches, current_time, wait_times
+
+
+class ShortestJobFirst(Algorithm):
+    """
+    Non-preemptive: whenever the CPU is free, the arrived process with the shortest
+    burst runs to completion. Ties go to the earlier arrival, then to workload order.
+    """
+
+    def __init__(self, switch_cost: int = 0) -> None:
+        super().__init__("SJF", switch_cost)
+
+    def schedule(self, processes) -> Tuple[int, int, np.ndarray]:
+        table = as_process_table(processes)
+        ids = table.ids.tolist()
+        arrival_times = table.arrival_times.tolist()
+        burst_times = table.burst_times.tolist()
+        arrival_order = np.argsort(table.arrival_times, kind="stable").tolist()
+
+        current_time = 0
+        context_switches = 0
+        wait_times = [0] * len(table)
+
+        ready = []  # Heap of (burst, arrival, row) of the arrived processes
+        next_arrival = 0
+        while next_arrival < len(arrival_order) or ready:
+            # Only for edge case when nothing is ready until the next arrival
+            if not ready:
+                current_time = max(
+                    current_time, arrival_times[arrival_order[next_arrival]]
+                )
+
+            while (
+                next_arrival < len(arrival_order)
+                and arrival_times[arrival_order[next_arrival]] <= current_time
+            ):
+                row = arrival_order[next_arrival]
+                heapq.heappush(ready, (burst_times[row], arrival_times[row], row))
+                next_arrival += 1
+
+            burst_time, arrival_time, row = heapq.heappop(ready)
+            context_switches += 1
+            current_time = self.switch(current_time)
+            wait_times[row] = current_time - arrival_time
+            self.add_step(ids[row], current_time, burst_time)
+            current_time += burst_time
+
+        wait_times = np.array(wait_times, dtype=np.int64)
+        self._report_completions(table, wait_times, wait_times)
+        return context_switches, current_time, wait_times
+
+
+class ShortestRemainingTimeFirst(Algorithm):
+    """
+    Preemptive SJF: the arrived process with the shortest remaining burst runs until it
+    finishes or an arrival has less left. Ties go to the earlier arrival, then to
+    workload order, so a running process is never preempted by an equal one.
+    """
+
+    def __init__(self, switch_cost: int = 0) -> None:
+        super().__init__("SRTF", switch_cost)
+
+    def schedule(self, processes) -> Tuple[int, int, np.ndarray]:
+        table = as_process_table(processes)
+        ids = table.ids.tolist()
+        arrival_times = table.arrival_times.tolist()
+        burst_times = table.burst_times.tolist()
+        arrival_order = np.argsort(table.arrival_times, kind="stable").tolist()
+
+        current_time = 0
+        context_switches = 0
+        wait_times = [0] * len(table)
+        response_times = [-1] * len(table)  # Wait until the first slice
+
+        ready = []  # Heap of (remaining, arrival, row) of the arrived processes
+        next_arrival = 0
+        last_row = -1
+        while next_arrival < len(arrival_order) or ready:
+            # Only for edge case when nothing is ready until the next arrival
+            if not ready:
+                current_time = max(
+                    current_time, arrival_times[arrival_order[next_arrival]]
+                )
+
+            while (
+                next_arrival < len(arrival_order)
+                and arrival_times[arrival_order[next_arrival]] <= current_time
+            ):
+                row = arrival_order[next_arrival]
+                heapq.heappush(ready, (burst_times[row], arrival_times[row], row))
+                next_arrival += 1
+
+            remaining_time, arrival_time, row = heapq.heappop(ready)
+
+            # Only count context switches if the process is different
+            if last_row != row:
+                last_row = row
+                context_switches += 1
+                current_time = self.switch(current_time)
+            if response_times[row] < 0:
+                response_times[row] = current_time - arrival_time
+
+            # Run until the process finishes or the next arrival may preempt it, after
+            # at least one unit if it arrived during the switch
+            execution_time = remaining_time
+            if next_arrival < len(arrival_order):
+                execution_time = min(
+                    execution_time,
+                    max(arrival_times[arrival_order[next_arrival]] - current_time, 1),
+                )
+            self.add_step(ids[row], current_time, execution_time)
+            current_time += execution_time
+
+            if remaining_time > execution_time:
+                heapq.heappush(
+                    ready, (remaining_time - execution_time, arrival_time, row)
+                )
+            else:
+                wait_times[row] = current_time - arrival_time - burst_times[row]
+
+        wait_times = np.array(wait_times, dtype=np.int64)
+        self._report_completions(table, wait_times, response_times)
+        return context_switches, current_time, wait_times
+
+
+class CompletelyFair(Algorithm):
+    """
+    CFS-like fair scheduler. Runnable processes are ordered by virtual runtime, the
+    CPU time they got scaled by NICE_0_WEIGHT / weight, and the one with the smallest
+    vruntime runs next. Its slice is its weight's share of the scheduling period
+    (target_latency, stretched to min_granularity per runnable process), but at least
+    min_granularity. Arriving processes start at the smallest vruntime seen so far.
+    """
+
+    def __init__(
+        self,
+        min_granularity: int = 3,
+        target_latency: int = 24,
+        weights: Tuple[int, int] = PRIORITY_WEIGHTS,
+        switch_cost: int = 0,
+    ) -> None:
+        super().__init__("CFS", switch_cost)
+        self.min_granularity = min_granularity
+        self.target_latency = target_latency
+        self.weights = weights
+
+    def schedule(self, processes) -> Tuple[int, int, np.ndarray]:
+        table = as_process_table(processes)
+        ids = table.ids.tolist()
+        arrival_times = table.arrival_times.tolist()
+        burst_times = table.burst_times.tolist()
+        weights = [self.weights[priority] for priority in table.priorities.tolist()]
+        arrival_order = np.argsort(table.arrival_times, kind="stable").tolist()
+
+        current_time = 0
+        context_switches = 0
+        wait_times = [0] * len(table)
+        response_times = [-1] * len(table)  # Wait until the first slice
+        remaining_times = list(burst_times)
+
+        # Heap of (vruntime, enqueue number, row), the number keeps ties in FIFO order
+        ready = []
+        enqueued = 0
+        total_weight = 0  # Of all runnable processes, including the running one
+        min_vruntime = 0.0
+        next_arrival = 0
+        last_row = -1
+        while next_arrival < len(arrival_order) or ready:
+            # Only for edge case when nothing is ready until the next arrival
+            if not ready:
+                current_time = max(
+                    current_time, arrival_times[arrival_order[next_arrival]]
+                )
+
+            while (
+                next_arrival < len(arrival_order)
+                and arrival_times[arrival_order[next_arrival]] <= current_time
+            ):
+                row = arrival_order[next_arrival]
+                heapq.heappush(ready, (min_vruntime, enqueued, row))
+                enqueued += 1
+                total_weight += weights[row]
+                next_arrival += 1
+
+            vruntime, _, row = heapq.heappop(ready)
+            min_vruntime = max(min_vruntime, vruntime)
+
+            # Only count context switches if the process is different
+            if last_row != row:
+                last_row = row
+                context_switches += 1
+                current_time = self.switch(current_time)
+            if response_times[row] < 0:
+                response_times[row] = current_time - arrival_times[row]
+
+            period = max(self.target_latency, (len(ready) + 1) * self.min_granularity)
+            time_slice = max(
+                self.min_granularity, period * weights[row] // total_weight
+            )
+            execution_time = min(remaining_times[row], time_slice)
+            self.add_step(ids[row], current_time, execution_time)
+
+            current_time += execution_time
+            remaining_times[row] -= execution_time
+            vruntime += execution_time * NICE_0_WEIGHT / weights[row]
+
+            if remaining_times[row] > 0:
+                heapq.heappush(ready, (vruntime, enqueued, row))
+                enqueued += 1
+            else:
+                total_weight -= weights[row]
+                wait_times[row] = current_time - arrival_times[row] - burst_times[row]
+
+        wait_times = np.array(wait_times, dtype=np.int64)
+        self._report_completions(table, wait_times, response_times)
+        return context_switches, current_time, wait_times
+
+
+# Metrics printed by Scheduler.display_metrics with their unit, the spread and the other
+# percentiles are only returned by get_metrics
+DISPLAYED_METRICS = {
+    "average_wait_time": "Einheiten",
+    "wait_time_p95": "Einheiten",
+    "average_turnaround_time": "Einheiten",
+    "average_response_time": "Einheiten",
+    "average_io_wait_time": "Einheiten",
+    "fairness_index": "Einheiten",  # Standard deviation of the wait times
+    "throughput": "Prozesse pro Einheit",
+    "context_switches": "",
+    "cpu_efficiency": "",  # Share of the CPU time spent on the processes
+}
+
 
 class Scheduler:
     def __init__(self) -> None:
         self.processes = []
         self.metrics = {}
+        # IncrementalRun of every algorithm run incrementally
+        self.incremental_runs = {}
+        self.cache = default_cache()  # Results are looked up here first if set
 
     def add_process(self, process) -> None:
         self.processes.append(process)
 
-    def run_algorithm(self, algorithm, display=True) -> None:
-        context_switches, current_time, wait_times = algorithm.schedule(self.processes)
-        self.calculate_metrics(context_switches, current_time, wait_times)
+    def run_algorithm(
+        self,
+        algorithm,
+        display=True,
+        engine="reference",
+        record_trace=True,
+        incremental=False,
+    ) -> None:
+        # With record_trace=False only the metrics are computed, get_steps stays empty
+        if incremental and not algorithm.resumable:
+            incremental = False  # Without a resumable engine every run is a full one
+
+        key = None
+        # Algorithms whose arguments cannot be read back have no key and run uncached
+        if (
+            self.cache is not None
+            and algorithm.cacheable
+            and algorithm.keeps_parameters()
+            and not incremental
+        ):
+            key = self.cache.key(algorithm, self.processes, engine)
+            cached = self.cache.get(key, with_trace=record_trace)
+            if cached is not None:
+                algorithm.reset()
+                algorithm.record_trace = record_trace
+                if record_trace:
+                    algorithm.add_steps(*cached.trace)
+                self.metrics = cached.metrics
+                if display:
+                    self.display_metrics(algorithm.name)
+                return
+
+        statistics = StreamingMetrics()
+        if incremental:
+            # Reruns after editing the processes only reschedule from the last
+            # checkpoint before the edit, with the resumable engine of the algorithm
+            if algorithm not in self.incremental_runs:
+                self.incremental_runs[algorithm] = IncrementalRun(algorithm)
+            context_switches, current_time, wait_times = self.incremental_runs[
+                algorithm
+            ].run(self.processes, record_trace=record_trace, sink=statistics)
+        else:
+            context_switches, current_time, wait_times = algorithm.run(
+                self.processes,
+                engine=engine,
+                record_trace=record_trace,
+                sink=statistics,
+            )
+        self.calculate_metrics(
+            context_switches,
+            current_time,
+            wait_times,
+            statistics,
+            algorithm.overhead_time(context_switches),
+        )
+        if key is not None:
+            trace = algorithm.get_trace() if record_trace else None
+            self.cache.put(key, self.metrics, trace)
         if display:
             self.display_metrics(algorithm.name)
 
     def calculate_metrics(
-        self, context_switches: int, current_time: int, wait_times: int
+        self,
+        context_switches: int,
+        current_time: int,
+        wait_times: int,
+        statistics: Optional[StreamingMetrics] = None,
+        overhead_time: int = 0,
     ) -> None:
-        total_turnaround_time = 0
-        for process in self.processes:
-            total_turnaround_time += wait_times[process.id - 1] + process.burst_time
+        # Turnaround is wait plus burst plus I/O, so the order of wait_times does not
+        # matter. Only the sink sees the I/O time of the processes.
+        total_wait_time = int(np.sum(wait_times))
+        total_burst_time = int(as_process_table(self.processes).burst_times.sum())
+        total_io_time = statistics.total_io_time if statistics is not None else 0
+        total_turnaround_time = total_wait_time + total_burst_time + total_io_time
 
         # print(f"Wait times: {wait_times}, len: {len(self.processes)}")
-        average_wait_time = sum(wait_times) / len(self.processes)
+        average_wait_time = total_wait_time / len(self.processes)
         average_turnaround_time = total_turnaround_time / len(self.processes)
         throughput = len(self.processes) / current_time
         fairness_index = np.std(wait_times)
 
+        # Share of the CPU time spent on the processes instead of on switching
+        cpu_efficiency = total_burst_time / max(total_burst_time + overhead_time, 1)
+
         self.metrics = {
             "average_wait_time": average_wait_time,
             "average_turnaround_time": average_turnaround_time,
             "throughput": throughput,
             "fairness_index": fairness_index,
             "context_switches": context_switches,
+            "cpu_efficiency": cpu_efficiency,
+            "average_io_wait_time": total_io_time / len(self.processes),
         }
 
-    def set_processes(self, processes) -> None:
+        # Spread and tail percentiles collected while the processes completed
+        if statistics is not None:
+            self.metrics.update(statistics.statistics())
+
+    def set_processes(
+        self, processes: Union[ProcessTable, List[SequenceDiagrammProcess]]
+    ) -> None:
         self.processes = processes
 
     def get_metrics(self) -> dict:
@@ -266,8 +1031,17 @@ class Scheduler:
 
     def display_metrics(self, name) -> None:
         print(f"Evaluating {name}")
-        for metric, value in self.metrics.items():
-            print(f"{metric.replace('_', ' ').title()}: {value:.2f} Einheiten")
+        for metric, unit in DISPLAYED_METRICS.items():
+            if metric in self.metrics:
+                label = metric.replace("_", " ").title()
+                value = self.metrics[metric]
+                # Small rates like the throughput would round to 0.00
+                value = (
+                    f"{value:.2f}"
+                    if value == 0 or abs(value) >= 0.01
+                    else f"{value:.2e}"
+                )
+                print(f"{label}: {value} {unit}".rstrip())
         print()
 
 
@@ -288,17 +1062,20 @@ def create_processes(
     std_dev_burst: float = 600,
     percentage_high_priority: float = 0.2,
     arrival_time_variation: float = 100,  # Neue Variable für Ankunftszeitvariation
-) -> List[SequenceDiagrammProcess]:
-    processes = []
+) -> ProcessTable:
+    arrival_times = np.zeros(num_processes, dtype=np.int64)
+    burst_times = np.zeros(num_processes, dtype=np.int64)
+    priorities = np.zeros(num_processes, dtype=np.int8)
     base_arrival_time = 0
     for i in range(num_processes):
-        burst_time = max(
+        burst_times[i] = max(
             1, int(round(np.random.normal(mean_burst_time, std_dev_burst)))
         )
-        priority = "high" if np.random.random() < percentage_high_priority else "low"
+        if np.random.random() < percentage_high_priority:
+            priorities[i] = PRIORITY_HIGH
 
         # Anpassung der Ankunftszeit, um Clusterbildung zu simulieren
-        arrival_time = max(
+        arrival_times[i] = max(
             0,
             int(
                 base_arrival_time
@@ -306,19 +1083,13 @@ def create_processes(
             ),
         )
 
-        process = SequenceDiagrammProcess(
-            id=i + 1,
-            arrival_time=arrival_time,
-            burst_time=burst_time,
-            priority=priority,
-        )
-        processes.append(process)
-
         base_arrival_time += max(
             0, round(np.random.uniform(0, 25 * arrival_time_variation))
         )
 
-    return processes
+    return ProcessTable(
+        np.arange(1, num_processes + 1), arrival_times, burst_times, priorities
+    )
 
 
 def create_linechart_metrics(
@@ -326,19 +1097,65 @@ def create_linechart_metrics(
     steps: int = 10,
     stepsize: int = 1_000,
     metric: str = "average_turnaround_time",
+    checkpointed: bool = False,
 ) -> List[np.ndarray]:
     total_processes_needed = steps * stepsize
     all_processes = create_processes(num_processes=total_processes_needed)
+    sizes = [(step + 1) * stepsize for step in range(steps)]
 
     dataset = []
     for algorithm in algorithms:
         stats = []
+        if checkpointed:
+            # Prefix results come from checkpoints instead of an engine, own keys
+            cache = None
+            if algorithm.cacheable and algorithm.keeps_parameters():
+                cache = default_cache()
+            keys = []
+            if cache is not None:
+                keys = [
+                    cache.key(algorithm, all_processes[:size], "prefixes")
+                    for size in sizes
+                ]
+                cached = [cache.get(key) for key in keys]
+                # Entries written before the prefixes had statistics miss their keys
+                if all(
+                    result is not None and metric in result.metrics for result in cached
+                ):
+                    dataset.append(
+                        np.array([result.metrics[metric] for result in cached])
+                    )
+                    continue
+
+            # One pass over the whole workload, each prefix is finished from a checkpoint
+            results = algorithm.run_prefixes(all_processes, sizes, statistics=True)
+            for index, (
+                context_switches,
+                current_time,
+                wait_times,
+                statistics,
+            ) in enumerate(results):
+                scheduler = Scheduler()
+                scheduler.set_processes(all_processes[: sizes[index]])
+                scheduler.calculate_metrics(
+                    context_switches,
+                    current_time,
+                    wait_times,
+                    statistics,
+                    algorithm.overhead_time(context_switches),
+                )
+                if keys:
+                    cache.put(keys[index], scheduler.get_metrics())
+                stats.append(scheduler.get_metrics()[metric])
+            dataset.append(np.array(stats))
+            continue
+
         for step in range(steps):
             # Select the subset of processes for the current step
             processes = all_processes[: (step + 1) * stepsize]
             scheduler = Scheduler()
             scheduler.set_processes(processes)
-            scheduler.run_algorithm(algorithm, display=False)
+            scheduler.run_algorithm(algorithm, display=False, record_trace=False)
             metrics = scheduler.get_metrics()
             stats.append(metrics[metric])
         dataset.append(np.array(stats))
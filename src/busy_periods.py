@@ -0,0 +1,170 @@
+import numpy as np
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+from .algorithms import Algorithm
+from .cache import algorithm_description
+from .metrics import StreamingMetrics
+from .workload import ProcessTable, as_process_table, workload_digest
+
+# Busy periods are scheduled in groups of at least this many processes, so a worker
+# gets enough to do per message and a cached group covers several periods
+GROUP_SIZE = 4096
+
+
+def busy_period_starts(
+    arrival_times: np.ndarray, work_bounds: np.ndarray
+) -> np.ndarray:
+    """
+    First rows of the busy periods of a workload, found in one vectorized pass.
+
+    Processes are admitted in workload order, so a process is available at the latest
+    when all processes before it arrived, and it keeps the CPU busy for at most its work
+    bound. The end of that upper bound schedule follows F[i] = max(F[i - 1], A[i]) +
+    W[i], which unrolls to a cumulative sum plus a running maximum. Row i starts a new
+    period when everything before it is finished, even in the upper bound, before any
+    later process arrives.
+    """
+    arrival_times = np.asarray(arrival_times, dtype=np.int64)
+    work_bounds = np.asarray(work_bounds, dtype=np.int64)
+    if len(arrival_times) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    available_times = np.maximum.accumulate(arrival_times)
+    total_work = np.cumsum(work_bounds)
+    end_times = total_work + np.maximum.accumulate(
+        available_times - (total_work - work_bounds)
+    )
+    next_arrival_times = np.minimum.accumulate(arrival_times[::-1])[::-1]
+    boundaries = np.flatnonzero(end_times[:-1] < next_arrival_times[1:]) + 1
+    return np.concatenate(([0], boundaries))
+
+
+def group_starts(
+    period_starts: np.ndarray, num_processes: int, group_size: int = GROUP_SIZE
+) -> List[int]:
+    """Consecutive busy periods joined to groups of at least group_size processes"""
+    starts = []
+    start = 0
+    while start < num_processes:
+        starts.append(start)
+        position = np.searchsorted(period_starts, start + group_size)
+        if position == len(period_starts):
+            break  # No period starts after the group size, the rest is one group
+        start = int(period_starts[position])
+    return starts
+
+
+def _schedule_group(task) -> tuple:
+    algorithm, processes, engine, record_trace = task
+    # The reference loops index their lists by id, so the group is numbered from 1
+    # and the trace gets the original ids back
+    numbered = ProcessTable(
+        np.arange(1, len(processes) + 1),
+        processes.arrival_times,
+        processes.burst_times,
+        processes.priorities,
+        processes.bursts,
+        validate=False,
+    )
+    metrics = StreamingMetrics()
+    context_switches, current_time, wait_times = algorithm.run(
+        numbered, engine=engine, record_trace=record_trace, sink=metrics
+    )
+    trace = None
+    if record_trace:
+        ids, starts, sizes = algorithm.get_trace()
+        # Overhead segments keep their negative pseudo ids
+        ids = np.where(ids > 0, processes.ids[np.maximum(ids, 1) - 1], ids)
+        trace = (ids, starts, sizes)
+    return (
+        context_switches,
+        current_time,
+        np.asarray(wait_times, dtype=np.int64),
+        metrics,
+        trace,
+    )
+
+
+def run_busy_periods(
+    algorithm: Algorithm,
+    processes,
+    engine: Optional[str] = None,
+    record_trace: bool = True,
+    sink: Optional[StreamingMetrics] = None,
+    max_workers: Optional[int] = 1,
+    group_size: int = GROUP_SIZE,
+    cache: Optional[dict] = None,
+) -> Tuple[int, int, np.ndarray]:
+    """
+    Same result as algorithm.run, but the busy periods of the workload are scheduled
+    independently. Groups of periods (see group_starts) run on a process pool unless
+    max_workers is 1, or are taken from `cache` if they were scheduled before. The
+    cache is a dict kept by the caller, its keys include the algorithm class and
+    parameters, so one dict can serve several configurations.
+
+    Trace, wait times and metrics (merged into sink) are stitched back in workload
+    order. Algorithms without work_bounds and workloads with I/O bursts are simply run
+    by algorithm.run. Without an engine the fastest one for the workload is used.
+    """
+    table = as_process_table(processes)
+    engine = engine or algorithm.engine_for(table)
+
+    work_bounds = None
+    if table.bursts is None:
+        work_bounds = algorithm.work_bounds(table)
+    if work_bounds is None:
+        # Nothing to split, and state kept outside the trace (e.g. the per-CPU
+        # statistics of SymmetricMultiprocessing) stays on the algorithm
+        return algorithm.run(table, engine=engine, record_trace=record_trace, sink=sink)
+
+    starts = group_starts(
+        busy_period_starts(table.arrival_times, work_bounds), len(table), group_size
+    )
+    groups = [
+        table[start:stop] for start, stop in zip(starts, starts[1:] + [len(table)])
+    ]
+
+    results = [None] * len(groups)
+    keys = [None] * len(groups)
+    if not algorithm.keeps_parameters():
+        cache = None  # Without its parameters the configuration is not known
+    if cache is not None:
+        description = algorithm_description(algorithm)
+        for index, group in enumerate(groups):
+            keys[index] = (description, engine, record_trace, workload_digest(group))
+            results[index] = cache.get(keys[index])
+
+    missing = [index for index, result in enumerate(results) if result is None]
+    tasks = [
+        (algorithm.clone(), groups[index], engine, record_trace) for index in missing
+    ]
+    if max_workers == 1 or len(tasks) <= 1:
+        scheduled = [_schedule_group(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            scheduled = list(executor.map(_schedule_group, tasks))
+    for index, result in zip(missing, scheduled):
+        results[index] = result
+        if cache is not None:
+            cache[keys[index]] = result
+
+    # Periods never overlap in time, so the group results simply follow each other
+    algorithm.reset()
+    algorithm.record_trace = record_trace
+    algorithm.sink = sink
+    context_switches = 0
+    current_time = 0
+    wait_times = []
+    for group_switches, group_time, group_waits, metrics, trace in results:
+        context_switches += group_switches
+        current_time = max(current_time, group_time)
+        wait_times.append(group_waits)
+        if trace is not None:
+            algorithm.add_steps(*trace)
+        if sink is not None:
+            sink.merge(metrics)
+
+    wait_times = np.concatenate(wait_times) if wait_times else np.zeros(0, np.int64)
+    return context_switches, current_time, wait_times
@@ -0,0 +1,169 @@
+import hashlib
+import json
+import os
+import tempfile
+import zipfile
+import numpy as np
+
+from typing import Optional, Tuple
+
+from .engines import ENGINE_VERSION
+from .workload import as_process_table, workload_digest
+
+# Directory of the default cache, OS_SCHEDULING_CACHE overrides it and an empty value
+# switches the default cache off
+CACHE_DIRECTORY = os.path.join(os.path.expanduser("~"), ".cache", "os_scheduling")
+CACHE_SIZE = 1 << 30  # Bytes on disk before the least recently used results go
+
+_default_caches = {}
+
+
+def _json_value(value):
+    # NumPy scalars count by their value, objects like load balancers by their class
+    if isinstance(value, np.generic):
+        return value.item()
+    return type(value).__name__
+
+
+def algorithm_description(algorithm) -> str:
+    """Class and constructor arguments of an algorithm as JSON, to be used in keys"""
+    return json.dumps(
+        {"algorithm": type(algorithm).__name__, "parameters": algorithm.parameters()},
+        sort_keys=True,
+        default=_json_value,
+    )
+
+
+class CachedResult:
+    """Metrics of a run and its trace as (ids, starts, sizes), None if not stored"""
+
+    def __init__(
+        self, metrics: dict, trace: Optional[Tuple[np.ndarray, ...]] = None
+    ) -> None:
+        self.metrics = metrics
+        self.trace = trace
+
+
+class ResultCache:
+    """
+    Schedule results on disk, one compressed .npz file per key. A key is the hash of
+    the workload contents, the algorithm class and parameters, the engine and the
+    ENGINE_VERSION, so any change to those is a miss instead of a stale result.
+
+    The modification time of a file is its last use. Once the files exceed max_size
+    bytes the least recently used ones are deleted. Files are written atomically, so
+    several processes (e.g. sweep workers) can share one directory.
+    """
+
+    def __init__(self, directory: str, max_size: int = CACHE_SIZE) -> None:
+        self.directory = directory
+        self.max_size = max_size
+        self._size = None  # Estimate, other processes may write to the directory too
+
+    def key(self, algorithm, processes, engine: str) -> str:
+        description = json.dumps(
+            {
+                "algorithm": type(algorithm).__name__,
+                "parameters": algorithm.parameters(),
+                "engine": engine,
+                "engine_version": ENGINE_VERSION,
+            },
+            sort_keys=True,
+            default=_json_value,
+        )
+        digest = hashlib.blake2b(description.encode(), digest_size=16)
+        digest.update(workload_digest(as_process_table(processes)).encode())
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def get(self, key: str, with_trace: bool = False) -> Optional[CachedResult]:
+        """The stored result, None if there is none or it lacks a requested trace"""
+        path = self._path(key)
+        try:
+            with np.load(path) as stored:
+                if with_trace and "ids" not in stored:
+                    return None
+                metrics = json.loads(str(stored["metrics"]))
+                trace = None
+                if "ids" in stored:
+                    trace = (stored["ids"], stored["starts"], stored["sizes"])
+            os.utime(path)
+        except (OSError, ValueError, zipfile.BadZipFile):
+            return None  # Missing, evicted meanwhile or unreadable
+        return CachedResult(metrics, trace)
+
+    def put(
+        self,
+        key: str,
+        metrics: dict,
+        trace: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None,
+    ) -> None:
+        arrays = {
+            "metrics": np.array(
+                json.dumps(
+                    {name: np.asarray(value).item() for name, value in metrics.items()}
+                )
+            )
+        }
+        if trace is not None:
+            arrays.update(zip(("ids", "starts", "sizes"), trace))
+
+        # Created by the first result, so a cache that is never filled leaves no trace
+        os.makedirs(self.directory, exist_ok=True)
+        handle, temporary_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(handle, "wb") as stored:
+                np.savez_compressed(stored, **arrays)
+            size = os.path.getsize(temporary_path)
+            os.replace(temporary_path, self._path(key))
+        except BaseException:
+            os.remove(temporary_path)
+            raise
+
+        # Only rescan the directory when the estimate says it may be full
+        if self._size is not None:
+            self._size += size
+        if self._size is None or self._size > self.max_size:
+            self.evict()
+
+    def evict(self, max_size: Optional[int] = None) -> None:
+        """Deletes the least recently used results until the cache fits max_size"""
+        if max_size is None:
+            max_size = self.max_size
+        entries = []
+        total_size = 0
+        try:
+            with os.scandir(self.directory) as scanned:
+                for entry in scanned:
+                    if entry.name.endswith(".npz"):
+                        status = entry.stat()
+                        entries.append((status.st_mtime, status.st_size, entry.path))
+                        total_size += status.st_size
+        except FileNotFoundError:
+            pass  # Nothing stored yet
+
+        entries.sort()
+        for _, size, path in entries:
+            if total_size <= max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass  # Evicted by another process
+            total_size -= size
+        self._size = total_size
+
+    def clear(self) -> None:
+        self.evict(max_size=0)
+
+
+def default_cache() -> Optional[ResultCache]:
+    """Cache used by Scheduler unless one is set on it, None if switched off"""
+    directory = os.environ.get("OS_SCHEDULING_CACHE", CACHE_DIRECTORY)
+    if not directory:
+        return None
+    if directory not in _default_caches:
+        _default_caches[directory] = ResultCache(directory)
+    return _default_caches[directory]
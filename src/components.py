@@ -862,6 +862,12 @@ class AlgorithmAnimation:
         return Succession(*animations, run_time=duration)
 
 
+# Bar colors of the CPUs in a sequence diagram of a multiprocessor schedule
+CPU_COLORS = [ORANGE, BLUE, GREEN, PURPLE, TEAL, MAROON, GOLD, PINK]
+# Bar color of context switch and migration overhead
+OVERHEAD_COLOR = GRAY
+
+
 class SequenceDiagram(Mobject):
     """
     How to use:
@@ -890,14 +896,23 @@ class SequenceDiagram(Mobject):
             f"Sequence Diagram for {algorithm}", corner=upper_left_corner
         )
         self.steps = steps
-        self.processes = [
-            f"P{id} - {size}s" for id, size in self.__calculate_process_sizes().items()
-        ]
+        process_sizes = self.__calculate_process_sizes()
+        self.processes = [f"P{id} - {size}s" for id, size in process_sizes.items()]
+        # Lane of every id, the overhead of context switches and migrations (negative
+        # pseudo ids, see src/trace.py) gets a lane of its own below the processes
+        self.lanes = {id: lane for lane, id in enumerate(process_sizes)}
+        overhead_steps = [step for step in self.steps if step["id"] < 0]
+        if overhead_steps:
+            overhead = sum(step["size"] for step in overhead_steps)
+            self.processes.append(f"Overhead - {overhead}s")
+            for step in overhead_steps:
+                self.lanes[step["id"]] = len(self.processes) - 1
 
     def __calculate_process_sizes(self):
         size_sum = {}
         for step in self.steps:
-            size_sum[step["id"]] = size_sum.get(step["id"], 0) + step["size"]
+            if step["id"] >= 0:
+                size_sum[step["id"]] = size_sum.get(step["id"], 0) + step["size"]
 
         sorted_size_sum = dict(sorted(size_sum.items()))
         return sorted_size_sum
@@ -950,17 +965,38 @@ class SequenceDiagram(Mobject):
         )
         leftmost_object_x_position = process_texts[0].get_right()[0]
         available_space = rightmost_object_x_position - leftmost_object_x_position
-        total_size = sum(step["size"] / 2 for step in self.steps)
+        # Steps of several CPUs (see SymmetricMultiprocessing.get_steps) run at the
+        # same time, so their bars are placed at their start times and colored by CPU
+        timeline = any("cpu" in step for step in self.steps)
+        if timeline:
+            first_start = min(step["start"] for step in self.steps)
+            last_end = max(step["start"] + step["size"] for step in self.steps)
+            total_size = (last_end - first_start) / 2
+        else:
+            total_size = sum(step["size"] / 2 for step in self.steps)
         scaling_factor = available_space / total_size if total_size != 0 else 1
 
         bars = []
         process = None
         for step in self.steps:
+            left_x = None
+            process_color = ORANGE
+            if timeline:
+                left_x = (
+                    leftmost_object_x_position
+                    + DEFAULT_MOBJECT_TO_MOBJECT_BUFFER
+                    + (step["start"] - first_start) * scaling_factor / 2
+                )
+                process_color = CPU_COLORS[step["cpu"] % len(CPU_COLORS)]
+            if step["id"] < 0:
+                process_color = OVERHEAD_COLOR
             process = self.create_processes(
-                step["id"],
+                self.lanes[step["id"]],
                 step["size"] * scaling_factor,
                 process_texts,
                 process,
+                process_color=process_color,
+                left_x=left_x,
             )
             bars.append(process)
 
@@ -973,17 +1009,22 @@ class SequenceDiagram(Mobject):
         process_texts,
         previous_process,
         process_color=ORANGE,
+        left_x: float = None,
     ):
-        lane_y_position = process_texts[process_lane - 1].get_center()[1]
+        lane_y_position = process_texts[process_lane].get_center()[1]
 
         # y-axis positioning
         process_bar = ProcessAnimated(color=process_color, size=size, show_size=False)
         process_bar.move_to(lane_y_position * UP)
 
         # x-axis positioning
-        if not previous_process:
+        if left_x is not None:
+            process_bar.move_to(
+                (left_x + process_bar.width / 2) * RIGHT + lane_y_position * UP
+            )
+        elif not previous_process:
             process_bar.next_to(
-                process_texts[process_lane - 1],
+                process_texts[process_lane],
                 RIGHT,
                 buff=DEFAULT_MOBJECT_TO_MOBJECT_BUFFER,
             )
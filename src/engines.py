@@ -0,0 +1,660 @@
+import copy
+import numpy as np
+
+from collections import deque
+from itertools import compress
+from operator import itemgetter
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from .metrics import StreamingMetrics
+from .trace import SWITCH_OVERHEAD_ID
+from .workload import PRIORITY_HIGH, ProcessTable
+
+# Rows handed to an engine at once, bounds the memory for pending processes
+ENGINE_CHUNK_SIZE = 1 << 16
+
+# Part of every cached result key, increase it when a change alters scheduling results
+ENGINE_VERSION = 2
+
+
+def fcfs_vectorized(
+    arrival_times: np.ndarray,
+    burst_times: np.ndarray,
+    start_time: int = 0,
+    switch_cost: int = 0,
+) -> Tuple[np.ndarray, np.ndarray, int, int]:
+    """
+    FCFS over whole arrays, in the order given like FirstComeFirstServe.schedule.
+
+    A process starts at max(arrival, end of the previous process), which unrolls to
+    start_i = work_i + max(start_time, max_{j <= i}(arrival_j - work_j)) with work_i
+    being the burst time of everything before process i and start_time the time the
+    CPU becomes free. With a switch cost every process takes that much longer and its
+    slice starts after the switch. Returns slice start times, wait times, makespan and
+    context switches.
+    """
+    arrival_times = np.asarray(arrival_times, dtype=np.int64)
+    burst_times = np.asarray(burst_times, dtype=np.int64)
+    if len(arrival_times) == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty.copy(), start_time, 0
+
+    work = burst_times + switch_cost if switch_cost else burst_times
+    work_before = np.cumsum(work)
+    work_before -= work
+
+    start_times = arrival_times - work_before
+    np.maximum.accumulate(start_times, out=start_times)
+    np.maximum(start_times, start_time, out=start_times)
+    start_times += work_before
+    if switch_cost:
+        start_times += switch_cost
+
+    wait_times = start_times - arrival_times
+    makespan = int(start_times[-1] + burst_times[-1])
+
+    # Every process is one context switch, like in the reference loop
+    return start_times, wait_times, makespan, len(arrival_times)
+
+
+def with_switch_overhead(
+    ids: np.ndarray, start_times: np.ndarray, sizes: np.ndarray, switch_cost: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Steps of processes that each follow a context switch, with the overhead steps"""
+    if not switch_cost:
+        return ids, start_times, sizes
+
+    count = len(ids)
+    return (
+        np.column_stack((np.full(count, SWITCH_OVERHEAD_ID), ids)).ravel(),
+        np.column_stack((start_times - switch_cost, start_times)).ravel(),
+        np.column_stack((np.full(count, switch_cost), sizes)).ravel(),
+    )
+
+
+class WaitTimes:
+    """
+    Completion sink keeping the wait time of every process by its row, and the response
+    time too if keep_response_times is set. Completions are also passed on to `forward`
+    if given, e.g. a metrics.StreamingMetrics.
+    """
+
+    def __init__(
+        self, num_processes: int, forward=None, keep_response_times: bool = False
+    ) -> None:
+        self.values = np.zeros(num_processes, dtype=np.int64)
+        self.response_times = None
+        if keep_response_times:
+            self.response_times = np.zeros(num_processes, dtype=np.int64)
+        self.forward = forward
+
+    def complete(
+        self,
+        row: int,
+        wait_time: int,
+        burst_time: int,
+        response_time: int,
+        io_time: int = 0,
+    ) -> None:
+        self.values[row] = wait_time
+        if self.response_times is not None:
+            self.response_times[row] = response_time
+        if self.forward is not None:
+            self.forward.complete(row, wait_time, burst_time, response_time, io_time)
+
+    def complete_many(
+        self,
+        rows: np.ndarray,
+        wait_times: np.ndarray,
+        burst_times: np.ndarray,
+        response_times: np.ndarray,
+        io_times: Optional[np.ndarray] = None,
+    ) -> None:
+        self.values[rows] = wait_times
+        if self.response_times is not None:
+            self.response_times[rows] = response_times
+        if self.forward is not None:
+            self.forward.complete_many(
+                rows, wait_times, burst_times, response_times, io_times
+            )
+
+
+def reject_io_bursts(processes: ProcessTable) -> None:
+    # The engines here schedule one CPU burst per process and would drop the I/O
+    if processes.bursts is not None:
+        raise ValueError(
+            "Workloads with I/O bursts can only be scheduled by the 'io' engine"
+        )
+
+
+class FirstComeFirstServeEngine:
+    """
+    FCFS with the engine interface of RoundRobinEngine. A FCFS process never depends
+    on later ones, so every chunk is scheduled right away with fcfs_vectorized and
+    reported to the sink as a whole.
+    """
+
+    def __init__(
+        self,
+        add_step: Optional[Callable[[int, int, int], None]] = None,
+        sink=None,
+        switch_cost: int = 0,
+    ) -> None:
+        self.add_step = add_step
+        self.sink = sink
+        self.switch_cost = switch_cost
+
+        self.current_time = 0
+        self.context_switches = 0
+        self.loaded = 0  # Rows handed over so far
+
+    def extend(self, processes: ProcessTable) -> None:
+        reject_io_bursts(processes)
+        start_times, wait_times, current_time, context_switches = fcfs_vectorized(
+            processes.arrival_times,
+            processes.burst_times,
+            self.current_time,
+            self.switch_cost,
+        )
+        start = self.loaded
+        self.loaded += len(processes)
+        self.current_time = current_time
+        self.context_switches += context_switches
+
+        if self.add_step is not None:
+            steps = with_switch_overhead(
+                processes.ids, start_times, processes.burst_times, self.switch_cost
+            )
+            for process_id, start_time, size in zip(*(step.tolist() for step in steps)):
+                self.add_step(process_id, start_time, size)
+        if self.sink is not None:
+            # Waiting ends with the only slice, so the response time is the wait time
+            self.sink.complete_many(
+                np.arange(start, self.loaded),
+                wait_times,
+                processes.burst_times,
+                wait_times,
+            )
+
+    def fork(self) -> "FirstComeFirstServeEngine":
+        clone = copy.copy(self)
+        clone.add_step = None
+        return clone
+
+    def advance(self, final: bool = False) -> bool:
+        # Everything handed over is already scheduled
+        return True
+
+
+class RoundRobinEngine:
+    """
+    Event-driven Round Robin with the same semantics as RoundRobin.schedule.
+
+    Processes that have arrived wait in a ready deque, processes that have not
+    arrived yet wait in a pending deque in workload order. Each quantum therefore
+    costs O(1) amortized instead of a linear re-insert, and full rounds of the ready
+    queue before the next arrival or completion are skipped in closed form.
+
+    The workload is handed over in chunks with extend() and the state lives on the
+    engine, so a run can be paused with advance() and continued or copied with fork().
+    Finished processes are reported to the sink (see WaitTimes) with their row, wait,
+    burst and response time.
+    """
+
+    def __init__(
+        self,
+        quantum: int,
+        add_step: Optional[Callable[[int, int, int], None]] = None,
+        sink=None,
+        switch_cost: int = 0,
+    ) -> None:
+        self.quantum = quantum
+        self.add_step = add_step
+        self.sink = sink
+        self.switch_cost = switch_cost
+
+        self.current_time = 0
+        self.context_switches = 0
+        self.last_process_id = -1
+        self.loaded = 0  # Rows handed over so far
+
+        # Pending entries are (row, id, arrival time, burst time)
+        self.pending = deque()
+        # Ready entries are [row, remaining burst, last end time, wait time, id,
+        # burst time, response time], the response time is -1 until the first run
+        self.ready = deque()
+        self.preempted = None  # Goes back to the ready queue after the arrivals
+
+    def extend(self, processes: ProcessTable) -> None:
+        reject_io_bursts(processes)
+        start = self.loaded
+        self.loaded += len(processes)
+        self.pending.extend(
+            zip(
+                range(start, self.loaded),
+                processes.ids.tolist(),
+                processes.arrival_times.tolist(),
+                processes.burst_times.tolist(),
+            )
+        )
+
+    def fork(self) -> "RoundRobinEngine":
+        """Copy of the scheduling state without a step callback"""
+        clone = copy.copy(self)
+        clone.add_step = None
+        clone.pending = self.pending.copy()
+        clone.ready = deque(entry.copy() for entry in self.ready)
+        if self.preempted is not None:
+            clone.preempted = self.preempted.copy()
+        return clone
+
+    def advance(self, final: bool = False) -> bool:
+        """
+        Schedules the processes handed over so far. Unless final is set, it pauses
+        right before the first decision that depends on a process not handed over yet,
+        so the state is valid for the current workload as well as for any extension.
+        Returns True once everything is finished.
+        """
+        quantum = self.quantum
+        switch_cost = self.switch_cost
+        add_step = self.add_step
+        complete = self.sink.complete if self.sink is not None else None
+        pending = self.pending
+        ready = self.ready
+
+        current_time = self.current_time
+        context_switches = self.context_switches
+        last_process_id = self.last_process_id
+        preempted = self.preempted
+
+        # Dispatches until the ready queue is checked for full rounds again, so the
+        # check costs O(1) amortized per dispatch
+        round_check = 0
+
+        finished = False
+        while True:
+            if preempted is not None:
+                # Everything that arrived in the meantime is queued before the preempted process
+                while pending and pending[0][2] <= current_time:
+                    row, process_id, arrival_time, burst_time = pending.popleft()
+                    ready.append(
+                        [row, burst_time, arrival_time, 0, process_id, burst_time, -1]
+                    )
+                if not pending and not final:
+                    break
+                ready.append(preempted)
+                preempted = None
+
+            round_check -= 1
+            if round_check <= 0 and ready and (pending or final):
+                round_check = len(ready)
+                rounds = self._full_rounds(
+                    current_time, last_process_id, pending[0][2] if pending else None
+                )
+                if rounds:
+                    # The queue keeps its order, the last process was preempted last
+                    size = len(ready)
+                    current_time = ready[-1][2]
+                    if size > 1:
+                        context_switches += rounds * size
+                        last_process_id = ready[-1][4]
+                    preempted = ready.pop()
+                    continue
+
+            if ready:
+                entry = ready.popleft()
+            elif pending:
+                # Nothing is ready, so the next pending process runs (possibly after idling)
+                row, process_id, arrival_time, burst_time = pending.popleft()
+                entry = [row, burst_time, arrival_time, 0, process_id, burst_time, -1]
+            else:
+                finished = final
+                break
+
+            process_id = entry[4]
+
+            # Only for edge case when the process arrives after the current time
+            if current_time < entry[2]:
+                current_time = entry[2]
+
+            # Only count context switches if the process is different
+            if last_process_id != process_id:
+                last_process_id = process_id
+                context_switches += 1
+                if switch_cost:
+                    if add_step is not None:
+                        add_step(SWITCH_OVERHEAD_ID, current_time, switch_cost)
+                    current_time += switch_cost
+
+            execution_time = min(entry[1], quantum)
+            if add_step is not None:
+                add_step(process_id, current_time, execution_time)
+
+            entry[3] += current_time - entry[2]
+            if entry[6] < 0:
+                entry[6] = entry[3]
+            current_time += execution_time
+            entry[2] = current_time
+            entry[1] -= execution_time
+
+            if entry[1] > 0:
+                preempted = entry
+            elif complete is not None:
+                complete(entry[0], entry[3], entry[5], entry[6])
+
+        self.current_time = current_time
+        self.context_switches = context_switches
+        self.last_process_id = last_process_id
+        self.preempted = preempted
+        return finished
+
+    def _full_rounds(
+        self, current_time: int, last_process_id: int, next_arrival: Optional[int]
+    ) -> int:
+        """
+        Runs as many full rounds of the ready queue as possible at once: rounds where
+        every process uses its whole quantum and no arrival is admitted. Every entry is
+        advanced in closed form and the steps are recorded like one by one, the queue
+        keeps its order. Returns the number of rounds, 0 if not even one is possible.
+        """
+        ready = self.ready
+        quantum = self.quantum
+        size = len(ready)
+        if size == 1:
+            if ready[0][4] != last_process_id:
+                return 0  # Switches once and then keeps running, left to the loop
+            switch_cost = 0  # The same process continues
+        else:
+            switch_cost = self.switch_cost
+        slice_time = switch_cost + quantum
+        round_time = size * slice_time
+
+        # A round must end before the next arrival and leave every process unfinished
+        rounds = (min(map(itemgetter(1), ready)) - 1) // quantum
+        if next_arrival is not None:
+            rounds = min(rounds, (next_arrival - current_time - 1) // round_time)
+        if rounds <= 0:
+            return 0
+
+        add_step = self.add_step
+        if add_step is not None and size == 1:
+            # The trace merges the quanta of a process running alone anyway
+            add_step(ready[0][4], current_time, rounds * quantum)
+        elif add_step is not None:
+            start_time = current_time
+            for _ in range(rounds):
+                for entry in ready:
+                    if switch_cost:
+                        add_step(SWITCH_OVERHEAD_ID, start_time, switch_cost)
+                    add_step(entry[4], start_time + switch_cost, quantum)
+                    start_time += slice_time
+
+        # Between two runs a process waits for the rest of the round
+        later_wait = (rounds - 1) * (round_time - quantum)
+        for position, entry in enumerate(ready):
+            start_time = current_time + position * slice_time + switch_cost
+            entry[3] += start_time - entry[2]
+            if entry[6] < 0:
+                entry[6] = entry[3]
+            entry[3] += later_wait
+            entry[1] -= rounds * quantum
+            entry[2] = start_time + (rounds - 1) * round_time + quantum
+        return rounds
+
+
+class MultiLevelQueueEngine:
+    """
+    Event-driven MultiLevelQueue with the same semantics as MultiLevelQueue.schedule.
+
+    High priority processes use Round Robin like RoundRobinEngine, low priority
+    processes run FCFS in one segment until they finish or the next high priority
+    process arrives. Idle time is skipped by jumping to the next arrival.
+    Times are expected to be integers, like the one unit ticks of the reference.
+    """
+
+    def __init__(
+        self,
+        quantum: int,
+        add_step: Optional[Callable[[int, int, int], None]] = None,
+        sink=None,
+        switch_cost: int = 0,
+    ) -> None:
+        self.quantum = quantum
+        self.add_step = add_step
+        self.sink = sink
+        self.switch_cost = switch_cost
+
+        self.current_time = 0
+        self.context_switches = 0
+        self.last_process_id = -1
+        self.loaded = 0  # Rows handed over so far
+
+        # Pending entries are (row, id, arrival time, burst time), one deque per priority
+        self.high_pending = deque()
+        self.low_pending = deque()
+        # Running entries are [row, remaining burst, last end time, wait time, id,
+        # burst time, response time], the response time is -1 until the first run
+        self.high_ready = deque()
+        self.preempted = None  # Goes back to the high queue after the arrivals
+        self.low_entry = None  # Head of the low queue, only it may run
+
+    def extend(self, processes: ProcessTable) -> None:
+        reject_io_bursts(processes)
+        start = self.loaded
+        self.loaded += len(processes)
+        high_priority = (processes.priorities == PRIORITY_HIGH).tolist()
+        entries = list(
+            zip(
+                range(start, self.loaded),
+                processes.ids.tolist(),
+                processes.arrival_times.tolist(),
+                processes.burst_times.tolist(),
+            )
+        )
+        self.high_pending.extend(compress(entries, high_priority))
+        self.low_pending.extend(compress(entries, (not high for high in high_priority)))
+
+    def fork(self) -> "MultiLevelQueueEngine":
+        """Copy of the scheduling state without a step callback"""
+        clone = copy.copy(self)
+        clone.add_step = None
+        clone.high_pending = self.high_pending.copy()
+        clone.low_pending = self.low_pending.copy()
+        clone.high_ready = deque(entry.copy() for entry in self.high_ready)
+        if self.preempted is not None:
+            clone.preempted = self.preempted.copy()
+        if self.low_entry is not None:
+            clone.low_entry = self.low_entry.copy()
+        return clone
+
+    def advance(self, final: bool = False) -> bool:
+        """
+        Schedules the processes handed over so far. Unless final is set, it pauses
+        right before the first decision that depends on a process not handed over yet,
+        so the state is valid for the current workload as well as for any extension.
+        Returns True once everything is finished.
+        """
+        quantum = self.quantum
+        switch_cost = self.switch_cost
+        add_step = self.add_step
+        complete = self.sink.complete if self.sink is not None else None
+        high_pending = self.high_pending
+        low_pending = self.low_pending
+        high_ready = self.high_ready
+
+        current_time = self.current_time
+        context_switches = self.context_switches
+        last_process_id = self.last_process_id
+        preempted = self.preempted
+        low_entry = self.low_entry
+
+        finished = False
+        while True:
+            if preempted is not None:
+                # Everything that arrived in the meantime is queued before the preempted process
+                while high_pending and high_pending[0][2] <= current_time:
+                    row, process_id, arrival_time, burst_time = high_pending.popleft()
+                    high_ready.append(
+                        [row, burst_time, arrival_time, 0, process_id, burst_time, -1]
+                    )
+                if not high_pending and not final:
+                    break
+                high_ready.append(preempted)
+                preempted = None
+
+            # Use Round Robin for high priority processes
+            entry = None
+            if high_ready:
+                entry = high_ready.popleft()
+            elif high_pending:
+                if high_pending[0][2] <= current_time:
+                    row, process_id, arrival_time, burst_time = high_pending.popleft()
+                    entry = [
+                        row,
+                        burst_time,
+                        arrival_time,
+                        0,
+                        process_id,
+                        burst_time,
+                        -1,
+                    ]
+            elif not final:
+                break
+
+            if entry is None:
+                # Use FCFS for low priority processes, only the head of the queue may run
+                if low_entry is None:
+                    if low_pending:
+                        row, process_id, arrival_time, burst_time = (
+                            low_pending.popleft()
+                        )
+                        low_entry = [
+                            row,
+                            burst_time,
+                            arrival_time,
+                            0,
+                            process_id,
+                            burst_time,
+                            -1,
+                        ]
+                    elif not final:
+                        break
+
+                # The last end time of a low process that never ran is its arrival
+                if low_entry is None or low_entry[2] > current_time:
+                    # Nothing is ready, jump to the next arrival instead of ticking
+                    arrivals = []
+                    if high_pending:
+                        arrivals.append(high_pending[0][2])
+                    if low_entry is not None:
+                        arrivals.append(low_entry[2])
+                    if not arrivals:
+                        finished = True
+                        break
+                    current_time = min(arrivals)
+                    continue
+
+                entry = low_entry
+
+            process_id = entry[4]
+
+            # Only count context switches if the process is different
+            if last_process_id != process_id:
+                last_process_id = process_id
+                context_switches += 1
+                if switch_cost:
+                    if add_step is not None:
+                        add_step(SWITCH_OVERHEAD_ID, current_time, switch_cost)
+                    current_time += switch_cost
+
+            if entry is low_entry:
+                # Run until the process finishes or a high priority process arrives,
+                # at least the one unit the reference decided on before the switch
+                execution_time = entry[1]
+                if high_pending:
+                    execution_time = min(
+                        execution_time, max(high_pending[0][2] - current_time, 1)
+                    )
+            else:
+                execution_time = min(entry[1], quantum)
+
+            if add_step is not None:
+                add_step(process_id, current_time, execution_time)
+            entry[3] += current_time - entry[2]
+            if entry[6] < 0:
+                entry[6] = entry[3]
+            current_time += execution_time
+            entry[2] = current_time
+            entry[1] -= execution_time
+
+            if entry[1] > 0:
+                if entry is not low_entry:
+                    preempted = entry
+            else:
+                if complete is not None:
+                    complete(entry[0], entry[3], entry[5], entry[6])
+                if entry is low_entry:
+                    low_entry = None
+
+        self.current_time = current_time
+        self.context_switches = context_switches
+        self.last_process_id = last_process_id
+        self.preempted = preempted
+        self.low_entry = low_entry
+        return finished
+
+
+def run_engine(engine, processes: ProcessTable, chunk_size: int = ENGINE_CHUNK_SIZE):
+    """Runs an engine over a whole workload, handing it over chunk by chunk"""
+    for start in range(0, len(processes), chunk_size):
+        engine.extend(processes[start : start + chunk_size])
+        engine.advance()
+    engine.advance(final=True)
+
+
+def run_prefixes(
+    engine,
+    processes: ProcessTable,
+    sizes: List[int],
+    wait_times: WaitTimes,
+    statistics: bool = False,
+) -> Iterator[tuple]:
+    """
+    Results of an engine for each workload prefix in `sizes` (increasing) in one pass.
+    The engine must report completions to the `wait_times` sink. The run pauses at each
+    prefix boundary and only a fork finishes the prefix, the wait times of processes
+    it finishes are overwritten once the main run finishes them.
+
+    With statistics each result also has the StreamingMetrics of the prefix, which
+    needs a sink keeping the response times.
+    """
+    start = 0
+    for size in sizes:
+        engine.extend(processes[start:size])
+        start = size
+        engine.advance()
+
+        prefix = engine.fork()
+        prefix.advance(final=True)
+        prefix_wait_times = wait_times.values[:size].copy()
+        result = (prefix.context_switches, prefix.current_time, prefix_wait_times)
+        if statistics:
+            result += (
+                completion_metrics(
+                    prefix_wait_times,
+                    processes.burst_times[:size],
+                    wait_times.response_times[:size],
+                ),
+            )
+        yield result
+
+
+def completion_metrics(
+    wait_times: np.ndarray, burst_times: np.ndarray, response_times: np.ndarray
+) -> StreamingMetrics:
+    """StreamingMetrics of processes completed with the given times"""
+    metrics = StreamingMetrics()
+    metrics.complete_many(
+        np.arange(len(wait_times)), wait_times, burst_times, response_times
+    )
+    return metrics
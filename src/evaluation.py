@@ -0,0 +1,91 @@
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple, Type
+
+from .algorithms import Algorithm, Scheduler
+
+# (algorithm class, constructor parameters, workload)
+Job = Tuple[Type[Algorithm], dict, object]
+
+
+def evaluate(
+    algorithm_class: Type[Algorithm],
+    parameters: dict,
+    workload,
+    engine: Optional[str] = None,
+) -> dict:
+    """
+    Metrics of one algorithm on one workload, without recording a trace.
+    Without an engine the fastest one for the workload is used.
+    """
+    algorithm = algorithm_class(**parameters)
+    scheduler = Scheduler()
+    scheduler.set_processes(workload)
+    scheduler.run_algorithm(
+        algorithm,
+        display=False,
+        engine=engine or algorithm.engine_for(workload),
+        record_trace=False,
+    )
+    return scheduler.get_metrics()
+
+
+# Workloads used by several jobs, set once per worker process by _share_workloads
+_shared_workloads: List[object] = []
+
+
+def _share_workloads(workloads: List[object]) -> None:
+    global _shared_workloads
+    _shared_workloads = workloads
+
+
+def _evaluate_job(task) -> dict:
+    # Shared workloads are only referred to by their index, the others come along
+    algorithm_class, parameters, workload, shared_index, engine = task
+    if workload is None:
+        workload = _shared_workloads[shared_index]
+    return evaluate(algorithm_class, parameters, workload, engine)
+
+
+def evaluate_parallel(
+    jobs: Sequence[Job],
+    max_workers: Optional[int] = None,
+    chunksize: int = 1,
+    engine: Optional[str] = None,
+) -> List[dict]:
+    """
+    Evaluates (algorithm class, parameters, workload) jobs on a process pool and returns
+    the metrics in job order. Every job is deterministic, so the results are the same as
+    calling evaluate() for each job. With max_workers=1 everything runs in this process.
+    Larger chunks send several jobs per message to a worker, which pays off for many
+    small workloads.
+
+    A workload object used by several jobs goes to each worker once when the pool
+    starts and the jobs refer to it by index, a workload of a single job is sent with
+    that job only, so no worker holds workloads it never needs.
+    """
+    if max_workers == 1:
+        return [
+            evaluate(algorithm_class, parameters, workload, engine)
+            for algorithm_class, parameters, workload in jobs
+        ]
+
+    uses = Counter(id(workload) for _, _, workload in jobs)
+    shared_workloads = []
+    indices = {}  # Position in shared_workloads by the id of the workload object
+    tasks = []
+    for algorithm_class, parameters, workload in jobs:
+        if uses[id(workload)] == 1:
+            tasks.append((algorithm_class, parameters, workload, None, engine))
+            continue
+        if id(workload) not in indices:
+            indices[id(workload)] = len(shared_workloads)
+            shared_workloads.append(workload)
+        tasks.append((algorithm_class, parameters, None, indices[id(workload)], engine))
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_share_workloads,
+        initargs=(shared_workloads,),
+    ) as executor:
+        return list(executor.map(_evaluate_job, tasks, chunksize=chunksize))
@@ -0,0 +1,281 @@
+import heapq
+import numpy as np
+
+from collections import deque
+from typing import Callable, Optional, Tuple
+
+from .trace import SWITCH_OVERHEAD_ID
+from .workload import PRIORITY_HIGH, BurstSequences, ProcessTable
+
+
+def batched_quanta(remaining_time: int, quantum: int, horizon: int, queue) -> int:
+    """
+    Round robin slice of a process. With an empty queue nothing can take over before
+    the next event in `horizon` time units, so all quanta until then run as one slice.
+    """
+    if remaining_time <= quantum:
+        return remaining_time
+    if queue:
+        return quantum
+    quanta = max(-(-horizon // quantum), 1)
+    return min(remaining_time, quanta * quantum)
+
+
+class FirstComeFirstServePolicy:
+    """Ready processes run in the order they became ready, each CPU burst as a whole"""
+
+    def admission_times(self, processes: ProcessTable) -> np.ndarray:
+        # A process is admitted once it and every process before it have arrived
+        return np.maximum.accumulate(processes.arrival_times)
+
+    def reset(self, processes: ProcessTable) -> None:
+        self.queue = deque()
+
+    def ready(self, row: int) -> None:
+        self.queue.append(row)
+
+    def requeue(self, row: int) -> None:
+        self.queue.append(row)
+
+    def pick(self) -> int:
+        return self.queue.popleft()
+
+    def slice_length(self, row: int, remaining_time: int, horizon: int) -> int:
+        return remaining_time
+
+    def preempts(self, row: int, running_row: int) -> bool:
+        return False
+
+
+class RoundRobinPolicy(FirstComeFirstServePolicy):
+    """FIFO ready queue, a process runs at most one quantum before it is requeued"""
+
+    def __init__(self, quantum: int) -> None:
+        self.quantum = quantum
+
+    def slice_length(self, row: int, remaining_time: int, horizon: int) -> int:
+        return batched_quanta(remaining_time, self.quantum, horizon, self.queue)
+
+
+class MultiLevelQueuePolicy:
+    """
+    High priority processes use Round Robin, low priority processes FCFS. A high
+    priority process becoming ready preempts a low priority one, which stays at the
+    head of the low queue.
+    """
+
+    def __init__(self, quantum: int) -> None:
+        self.quantum = quantum
+
+    def admission_times(self, processes: ProcessTable) -> np.ndarray:
+        # Like FCFS, but every priority is admitted in workload order on its own
+        admission_times = np.empty(len(processes), dtype=np.int64)
+        for priority in np.unique(processes.priorities):
+            rows = np.flatnonzero(processes.priorities == priority)
+            admission_times[rows] = np.maximum.accumulate(processes.arrival_times[rows])
+        return admission_times
+
+    def reset(self, processes: ProcessTable) -> None:
+        self.high_priority = (processes.priorities == PRIORITY_HIGH).tolist()
+        self.high_queue = deque()
+        self.low_queue = deque()
+
+    def ready(self, row: int) -> None:
+        if self.high_priority[row]:
+            self.high_queue.append(row)
+        else:
+            self.low_queue.append(row)
+
+    def requeue(self, row: int) -> None:
+        if self.high_priority[row]:
+            self.high_queue.append(row)
+        else:
+            self.low_queue.appendleft(row)
+
+    def pick(self) -> int:
+        if self.high_queue:
+            return self.high_queue.popleft()
+        return self.low_queue.popleft()
+
+    def slice_length(self, row: int, remaining_time: int, horizon: int) -> int:
+        if self.high_priority[row]:
+            return batched_quanta(
+                remaining_time, self.quantum, horizon, self.high_queue
+            )
+        return remaining_time
+
+    def preempts(self, row: int, running_row: int) -> bool:
+        return self.high_priority[row] and not self.high_priority[running_row]
+
+
+def run_events(
+    processes: ProcessTable,
+    policy,
+    add_step: Optional[Callable[[int, int, int], None]] = None,
+    sink=None,
+    switch_cost: int = 0,
+) -> Tuple[int, int]:
+    """
+    Schedules processes alternating CPU and I/O bursts (see BurstSequences) on one CPU,
+    driven by time-ordered events: arrivals, I/O completions and the end of the running
+    slice. The policy decides which ready process runs and for how long.
+
+    Processes are admitted in workload order like by the other engines: a process
+    arriving before an earlier row of the workload waits for it, the policy gives the
+    admission times. Its wait still counts from its arrival. Arrivals are therefore
+    already sorted and the running slice is the only one that can end, so only I/O
+    completions need a heap. Events at the same time are handled in the order
+    arrivals, I/O completions, slice end, then an idle CPU picks the next process.
+
+    Quanta a process would run in a row because nothing else is ready are handled as
+    one slice. A process blocked on I/O joins the ready queue again when its I/O
+    completes, time in the ready queue counts as wait.
+
+    Finished processes are reported to the sink with their row, wait, CPU, response and
+    I/O time. Returns the context switches and the makespan.
+    """
+    bursts = processes.bursts
+    if bursts is None:
+        bursts = BurstSequences.single(processes.burst_times)
+    start, stop = int(bursts.offsets[0]), int(bursts.offsets[-1])
+    values = bursts.values[start:stop].tolist()
+    positions = (bursts.offsets[:-1] - start).tolist()  # Current burst of every row
+    last_positions = (bursts.offsets[1:] - start - 1).tolist()
+
+    ids = processes.ids.tolist()
+    arrival_times = processes.arrival_times.tolist()
+    burst_times = processes.burst_times.tolist()
+    admission_times = policy.admission_times(processes)
+    arrival_order = np.argsort(admission_times, kind="stable")
+    admission_times = admission_times[arrival_order].tolist()
+    arrival_order = arrival_order.tolist()
+    num_processes = len(processes)
+    policy.reset(processes)
+    # Bound once, the loop below runs for every event
+    ready, requeue, pick = policy.ready, policy.requeue, policy.pick
+    preempts, slice_length = policy.preempts, policy.slice_length
+    heappop, heappush = heapq.heappop, heapq.heappush
+
+    remaining_times = [values[position] for position in positions]
+    ready_times = [0] * num_processes  # Since when a process waits in the ready queue
+    wait_times = [0] * num_processes
+    io_times = [0] * num_processes
+    response_times = [-1] * num_processes  # Wait until the first slice
+
+    # Times of the next arrival and I/O completion, never when there is none
+    never = 1 << 63  # Later than any int64 time
+    admission_times.append(never)
+    next_arrival = 0
+    next_admission = admission_times[0]
+    unblocks = []  # Heap of (time, sequence number, row) of the I/O completions
+    next_unblock = never
+    sequence = 0
+
+    current_time = 0
+    context_switches = 0
+    last_row = -1
+    running = -1  # Row on the CPU
+    num_ready = 0
+    slice_start = 0
+    slice_end = 0
+
+    while True:
+        # Next point in time where something happens
+        next_time = next_admission if next_admission < next_unblock else next_unblock
+        if running >= 0:
+            if slice_end < next_time:
+                next_time = slice_end
+        elif next_time == never:
+            break
+        current_time = next_time
+
+        while next_admission == current_time:
+            row = arrival_order[next_arrival]
+            next_arrival += 1
+            next_admission = admission_times[next_arrival]
+            ready_times[row] = arrival_times[row]
+            ready(row)
+            num_ready += 1
+            if running >= 0 and preempts(row, running):
+                # Cut the running slice, after at least one unit if it is still switching
+                slice_end = max(current_time, slice_start + 1)
+
+        while next_unblock == current_time:
+            row = heappop(unblocks)[2]
+            next_unblock = unblocks[0][0] if unblocks else never
+            ready_times[row] = current_time
+            ready(row)
+            num_ready += 1
+            if running >= 0 and preempts(row, running):
+                slice_end = max(current_time, slice_start + 1)
+
+        if running >= 0 and slice_end == current_time:
+            row = running
+            running = -1
+            execution_time = current_time - slice_start
+            if add_step is not None:
+                add_step(ids[row], slice_start, execution_time)
+
+            remaining_times[row] -= execution_time
+            if remaining_times[row]:
+                ready_times[row] = current_time
+                requeue(row)
+                num_ready += 1
+            elif positions[row] == last_positions[row]:
+                if sink is not None:
+                    sink.complete(
+                        row,
+                        wait_times[row],
+                        burst_times[row],
+                        response_times[row],
+                        io_times[row],
+                    )
+            else:
+                # Block on the following I/O burst, then continue with the next CPU
+                # burst. Without I/O time the process is ready again right away.
+                position = positions[row]
+                io_time = values[position + 1]
+                io_times[row] += io_time
+                positions[row] = position + 2
+                remaining_times[row] = values[position + 2]
+                if io_time:
+                    unblock_time = current_time + io_time
+                    sequence += 1
+                    heappush(unblocks, (unblock_time, sequence, row))
+                    if unblock_time < next_unblock:
+                        next_unblock = unblock_time
+                else:
+                    ready_times[row] = current_time
+                    ready(row)
+                    num_ready += 1
+
+        if running >= 0 or not num_ready:
+            continue
+
+        row = pick()
+        num_ready -= 1
+        slice_start = current_time
+
+        # Only count context switches if the process is different
+        if last_row != row:
+            last_row = row
+            context_switches += 1
+            if switch_cost:
+                if add_step is not None:
+                    add_step(SWITCH_OVERHEAD_ID, slice_start, switch_cost)
+                slice_start += switch_cost
+
+        wait_times[row] += slice_start - ready_times[row]
+        if response_times[row] < 0:
+            response_times[row] = slice_start - arrival_times[row]
+
+        # Nothing becomes ready before the next event, if there is one
+        horizon = next_admission if next_admission < next_unblock else next_unblock
+        if horizon == never:
+            horizon = remaining_times[row]
+        else:
+            horizon -= slice_start
+        running = row
+        slice_end = slice_start + slice_length(row, remaining_times[row], horizon)
+
+    return context_switches, current_time
@@ -0,0 +1,183 @@
+import numpy as np
+
+from typing import List, Optional, Tuple
+
+from .engines import WaitTimes
+from .metrics import StreamingMetrics
+from .workload import ProcessTable, as_process_table
+
+# Rows between two checkpoints before they are thinned out (see IncrementalRun._thin)
+CHECKPOINT_INTERVAL = 4096
+# A checkpoint copies the ready queue, so their number is bounded by thinning them
+MAX_CHECKPOINTS = 8
+
+
+def first_difference(old: ProcessTable, new: ProcessTable) -> int:
+    """
+    First row where two workloads differ, burst sequences included, the length of both
+    if they are equal
+    """
+    size = min(len(old), len(new))
+    changed = np.zeros(size, dtype=bool)
+    for column in ("ids", "arrival_times", "burst_times", "priorities"):
+        changed |= getattr(old, column)[:size] != getattr(new, column)[:size]
+
+    if (old.bursts is None) != (new.bursts is None):
+        return 0
+    if old.bursts is not None:
+        changed |= _changed_bursts(old.bursts, new.bursts, size)
+
+    rows = np.flatnonzero(changed)
+    return int(rows[0]) if len(rows) else size
+
+
+def _changed_bursts(old, new, size: int) -> np.ndarray:
+    # Rows among the first `size` whose burst sequences differ
+    old_lengths = np.diff(old.offsets[: size + 1])
+    new_lengths = np.diff(new.offsets[: size + 1])
+    changed = old_lengths != new_lengths
+    # Up to the first row of another length the sequences line up value by value
+    rows = np.flatnonzero(changed)
+    same = int(rows[0]) if len(rows) else size
+    old_values = old.values[old.offsets[0] : old.offsets[same]]
+    new_values = new.values[new.offsets[0] : new.offsets[same]]
+    positions = np.flatnonzero(old_values != new_values)
+    if len(positions):
+        row = np.searchsorted(old.offsets[1:] - old.offsets[0], positions[0], "right")
+        changed[row] = True
+    return changed
+
+
+class Checkpoint:
+    """State of a run right after the first `loaded` rows were handed to the engine"""
+
+    def __init__(
+        self, loaded: int, engine, metrics: StreamingMetrics, trace_mark: tuple
+    ) -> None:
+        self.loaded = loaded
+        self.engine = engine.fork()
+        self.metrics = metrics.copy()
+        self.trace_mark = trace_mark
+
+
+class IncrementalRun:
+    """
+    Runs an algorithm with a resumable engine (see Algorithm.create_engine) and keeps a
+    checkpoint of the engine, the metric accumulators and the trace every `interval`
+    rows. Running it again on an edited workload only schedules the rows from the last
+    checkpoint before the first changed row on, with the same result as a full run.
+
+    Every checkpoint holds a copy of the ready queue, so at most max_checkpoints are
+    kept (see _thin). They stay dense near the end of the workload and get sparser
+    towards its start, so edits near the end stay cheap.
+
+    The engine pauses before every decision depending on rows not handed over yet,
+    so a checkpoint only depends on the rows before it. The trace is continued on the
+    algorithm, which must not be run elsewhere in between.
+    """
+
+    def __init__(
+        self,
+        algorithm,
+        interval: int = CHECKPOINT_INTERVAL,
+        max_checkpoints: int = MAX_CHECKPOINTS,
+    ) -> None:
+        if not algorithm.resumable:
+            raise ValueError(f"{algorithm.name} has no resumable engine")
+        self.algorithm = algorithm
+        self.interval = interval
+        self.max_checkpoints = max_checkpoints
+
+        self.processes: Optional[ProcessTable] = None
+        self.record_trace = True
+        self.checkpoints: List[Checkpoint] = []
+        self.wait_times = np.zeros(0, dtype=np.int64)
+        self.metrics = StreamingMetrics()
+        self.result: Optional[Tuple[int, int]] = None
+        self.final_mark = None  # Trace position after the last run
+
+    def run(
+        self,
+        processes,
+        record_trace: bool = True,
+        sink: Optional[StreamingMetrics] = None,
+    ) -> Tuple[int, int, np.ndarray]:
+        """
+        Same as algorithm.run with the engine for processes, rescheduling only what the
+        edits since the last call changed. The metrics are merged into sink.
+        """
+        table = as_process_table(processes)
+        algorithm = self.algorithm
+
+        start = 0
+        if (
+            self.processes is not None
+            and record_trace == self.record_trace
+            and algorithm.trace_mark() == self.final_mark
+        ):
+            start = first_difference(self.processes, table)
+            if start == len(table) == len(self.processes):
+                return self._finish(sink)  # Nothing changed
+
+        # Continue from the last checkpoint that only saw unchanged rows
+        while self.checkpoints and self.checkpoints[-1].loaded > start:
+            self.checkpoints.pop()
+        if self.checkpoints:
+            checkpoint = self.checkpoints[-1]
+            loaded = checkpoint.loaded
+            metrics = checkpoint.metrics.copy()
+            algorithm.truncate_trace(checkpoint.trace_mark)
+            engine = checkpoint.engine.fork()
+        else:
+            loaded = 0
+            metrics = StreamingMetrics()
+            algorithm.reset()
+            engine = algorithm.create_engine()
+
+        # Rows finished before the checkpoint keep their wait time, the rest are
+        # finished again by the engine
+        wait_times = WaitTimes(len(table), forward=metrics)
+        wait_times.values[:loaded] = self.wait_times[:loaded]
+        algorithm.record_trace = record_trace
+        engine.add_step = algorithm.add_step if record_trace else None
+        engine.sink = wait_times
+
+        for chunk_start in range(loaded, len(table), self.interval):
+            engine.extend(table[chunk_start : chunk_start + self.interval])
+            engine.advance()
+            self.checkpoints.append(
+                Checkpoint(engine.loaded, engine, metrics, algorithm.trace_mark())
+            )
+            self._thin()
+        engine.advance(final=True)
+
+        self.processes = table
+        self.record_trace = record_trace
+        self.wait_times = wait_times.values
+        self.metrics = metrics
+        self.result = (engine.context_switches, engine.current_time)
+        self.final_mark = algorithm.trace_mark()
+        return self._finish(sink)
+
+    def _thin(self) -> None:
+        """
+        Drops checkpoints until at most max_checkpoints are left, each time the one
+        leaving the smallest gap relative to its distance from the newest checkpoint.
+        The spacing therefore grows geometrically towards the start of the workload.
+        """
+        checkpoints = self.checkpoints
+        while len(checkpoints) > self.max_checkpoints:
+            newest = checkpoints[-1].loaded
+
+            def relative_gap(index: int) -> float:
+                previous = checkpoints[index - 1].loaded if index else 0
+                following = checkpoints[index + 1].loaded
+                return (following - previous) / (newest - following + 1)
+
+            del checkpoints[min(range(len(checkpoints) - 1), key=relative_gap)]
+
+    def _finish(self, sink: Optional[StreamingMetrics]) -> Tuple[int, int, np.ndarray]:
+        if sink is not None:
+            sink.merge(self.metrics)
+        context_switches, current_time = self.result
+        return context_switches, current_time, self.wait_times.copy()
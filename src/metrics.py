@@ -0,0 +1,271 @@
+import copy
+import math
+import numpy as np
+
+from typing import List, Optional
+
+# Quantiles reported for every time measured per process
+QUANTILES = {"p50": 0.5, "p95": 0.95, "p99": 0.99}
+STATISTIC_NAMES = ("wait_time", "turnaround_time", "response_time")
+
+# Values added one by one are collected and folded in as a batch
+BUFFER_SIZE = 4096
+
+
+class QuantileSketch:
+    """
+    Approximate quantiles of non-negative values in constant memory.
+
+    Values are counted in logarithmic buckets, so every quantile is returned with a
+    relative error of at most `relative_accuracy` (values below 1 count as 0).
+    Sketches with the same accuracy can be merged by adding their counts.
+    """
+
+    def __init__(
+        self, relative_accuracy: float = 0.01, max_value: float = 2.0**63
+    ) -> None:
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.counts = np.zeros(
+            math.ceil(math.log(max_value) / self._log_gamma) + 2, dtype=np.int64
+        )
+
+    @property
+    def count(self) -> int:
+        return int(self.counts.sum())
+
+    def add_many(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        # Bucket 0 holds everything below 1, bucket i the values in
+        # (gamma^(i-2), gamma^(i-1)]
+        buckets = np.zeros(len(values), dtype=np.int64)
+        positive = values >= 1
+        buckets[positive] = (
+            np.ceil(np.log(values[positive]) / self._log_gamma).astype(np.int64) + 1
+        )
+        np.minimum(buckets, len(self.counts) - 1, out=buckets)
+        self.counts += np.bincount(buckets, minlength=len(self.counts))
+
+    def copy(self) -> "QuantileSketch":
+        clone = copy.copy(self)
+        clone.counts = self.counts.copy()
+        return clone
+
+    def merge(self, other: "QuantileSketch") -> None:
+        if other.gamma != self.gamma or len(other.counts) != len(self.counts):
+            raise ValueError("Only sketches with the same accuracy can be merged")
+        self.counts += other.counts
+
+    def quantile(self, q: float) -> float:
+        count = self.count
+        if count == 0:
+            return 0.0
+
+        rank = q * (count - 1)
+        bucket = int(np.searchsorted(np.cumsum(self.counts), rank, side="right"))
+        if bucket == 0:
+            return 0.0
+        # Middle of the bucket in relative terms
+        return 2 * self.gamma ** (bucket - 1) / (self.gamma + 1)
+
+
+class RunningStatistics:
+    """
+    Count, mean, variance (Welford), min, max and approximate quantiles of a stream of
+    values in constant memory.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0  # Sum of squared differences from the mean
+        self.min = math.inf
+        self.max = -math.inf
+        self.sketch = QuantileSketch(relative_accuracy)
+        self._buffer: List[float] = []
+
+    def add(self, value: float) -> None:
+        buffer = self._buffer
+        buffer.append(value)
+        if len(buffer) >= BUFFER_SIZE:
+            self._flush()
+
+    def add_many(self, values: np.ndarray) -> None:
+        self._flush()
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return
+
+        mean = values.mean()
+        self._combine(len(values), mean, np.square(values - mean).sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.sketch.add_many(values)
+
+    def copy(self) -> "RunningStatistics":
+        clone = copy.copy(self)
+        clone.sketch = self.sketch.copy()
+        clone._buffer = list(self._buffer)
+        return clone
+
+    def merge(self, other: "RunningStatistics") -> None:
+        """Adds the values seen by other, e.g. by a run in another process"""
+        self._flush()
+        other._flush()
+        if other.count == 0:
+            return
+
+        self._combine(other.count, other.mean, other._m2)
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.sketch.merge(other.sketch)
+
+    def _combine(self, count: int, mean: float, m2: float) -> None:
+        # Merge the statistics of a batch like two parallel Welford runs (Chan et al.)
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self._m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+
+    def _flush(self) -> None:
+        if self._buffer:
+            values = np.array(self._buffer, dtype=np.float64)
+            self._buffer = []
+            self.add_many(values)
+
+    @property
+    def variance(self) -> float:
+        # Population variance like np.var and np.std
+        self._flush()
+        return self._m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def quantile(self, q: float) -> float:
+        self._flush()
+        return self.sketch.quantile(q)
+
+    def summary(self, name: str) -> dict:
+        self._flush()
+        empty = self.count == 0
+        summary = {
+            f"{name}_std": self.std,
+            f"{name}_min": 0.0 if empty else self.min,
+            f"{name}_max": 0.0 if empty else self.max,
+        }
+        for label, q in QUANTILES.items():
+            summary[f"{name}_{label}"] = self.quantile(q)
+        return summary
+
+
+class StreamingMetrics:
+    """
+    Completion sink (see engines.WaitTimes) that accumulates the Scheduler metrics of
+    finished processes without keeping per-process values, together with the spread and
+    tail percentiles of wait, turnaround and response times.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01) -> None:
+        self.total_wait_time = 0
+        self.total_burst_time = 0
+        self.total_response_time = 0
+        self.total_io_time = 0  # Time blocked on I/O
+        self.wait_times = RunningStatistics(relative_accuracy)
+        self.turnaround_times = RunningStatistics(relative_accuracy)
+        self.response_times = RunningStatistics(relative_accuracy)
+
+    @property
+    def count(self) -> int:
+        self.wait_times._flush()
+        return self.wait_times.count
+
+    def complete(
+        self,
+        row: int,
+        wait_time: int,
+        burst_time: int,
+        response_time: int,
+        io_time: int = 0,
+    ) -> None:
+        self.total_wait_time += wait_time
+        self.total_burst_time += burst_time
+        self.total_response_time += response_time
+        self.total_io_time += io_time
+        self.wait_times.add(wait_time)
+        self.turnaround_times.add(wait_time + burst_time + io_time)
+        self.response_times.add(response_time)
+
+    def complete_many(
+        self,
+        rows: np.ndarray,
+        wait_times: np.ndarray,
+        burst_times: np.ndarray,
+        response_times: np.ndarray,
+        io_times: Optional[np.ndarray] = None,
+    ) -> None:
+        wait_times = np.asarray(wait_times, dtype=np.int64)
+        burst_times = np.asarray(burst_times, dtype=np.int64)
+        turnaround_times = wait_times + burst_times
+        if io_times is not None:
+            io_times = np.asarray(io_times, dtype=np.int64)
+            self.total_io_time += int(io_times.sum())
+            turnaround_times += io_times
+        self.total_wait_time += int(wait_times.sum())
+        self.total_burst_time += int(burst_times.sum())
+        self.total_response_time += int(np.sum(response_times))
+        self.wait_times.add_many(wait_times)
+        self.turnaround_times.add_many(turnaround_times)
+        self.response_times.add_many(response_times)
+
+    def copy(self) -> "StreamingMetrics":
+        """Independent snapshot, e.g. to continue a run from a checkpoint"""
+        clone = copy.copy(self)
+        clone.wait_times = self.wait_times.copy()
+        clone.turnaround_times = self.turnaround_times.copy()
+        clone.response_times = self.response_times.copy()
+        return clone
+
+    def merge(self, other: "StreamingMetrics") -> None:
+        """Adds the completions collected by other"""
+        self.total_wait_time += other.total_wait_time
+        self.total_burst_time += other.total_burst_time
+        self.total_response_time += other.total_response_time
+        self.total_io_time += other.total_io_time
+        self.wait_times.merge(other.wait_times)
+        self.turnaround_times.merge(other.turnaround_times)
+        self.response_times.merge(other.response_times)
+
+    def statistics(self) -> dict:
+        """Response time average plus spread and percentiles of every measured time"""
+        statistics = {
+            "average_response_time": self.total_response_time / max(self.count, 1)
+        }
+        for name, values in zip(
+            STATISTIC_NAMES,
+            (self.wait_times, self.turnaround_times, self.response_times),
+        ):
+            statistics.update(values.summary(name))
+        return statistics
+
+    def metrics(
+        self, context_switches: int, current_time: int, overhead_time: int = 0
+    ) -> dict:
+        """Same keys as Scheduler.get_metrics, over the processes finished so far"""
+        count = max(self.count, 1)
+        return {
+            "average_wait_time": self.total_wait_time / count,
+            "average_turnaround_time": (
+                self.total_wait_time + self.total_burst_time + self.total_io_time
+            )
+            / count,
+            "throughput": self.count / current_time if current_time else 0.0,
+            "fairness_index": self.wait_times.std,
+            "context_switches": context_switches,
+            "cpu_efficiency": self.total_burst_time
+            / max(self.total_burst_time + overhead_time, 1),
+            "average_io_wait_time": self.total_io_time / count,
+            **self.statistics(),
+        }
@@ -0,0 +1,123 @@
+import os
+import numpy as np
+import pandas as pd
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Tuple, Type, Union
+
+from .algorithms import Algorithm
+from .sweep import run_configuration
+from .workload import child_seed
+
+
+def bootstrap_interval(
+    values: np.ndarray,
+    confidence: float = 0.95,
+    num_resamples: int = 1_000,
+    seed: int = 0,
+) -> Tuple[float, float]:
+    """Percentile bootstrap confidence interval of the mean"""
+    values = np.asarray(values, dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    resamples = rng.integers(0, len(values), size=(num_resamples, len(values)))
+    means = values[resamples].mean(axis=1)
+
+    tail = (1 - confidence) / 2
+    low, high = np.quantile(means, [tail, 1 - tail])
+    return float(low), float(high)
+
+
+def summarize_replications(
+    samples: Dict[str, list], confidence: float = 0.95, num_resamples: int = 1_000
+) -> pd.DataFrame:
+    """Mean, standard deviation and bootstrap interval of every metric"""
+    rows = {}
+    for metric, values in samples.items():
+        values = np.asarray(values, dtype=np.float64)
+        ci_low, ci_high = bootstrap_interval(values, confidence, num_resamples)
+        rows[metric] = {
+            "mean": values.mean(),
+            "std": values.std(ddof=1) if len(values) > 1 else 0.0,
+            "ci_low": ci_low,
+            "ci_high": ci_high,
+            "ci_width": ci_high - ci_low,
+            "replications": len(values),
+        }
+    return pd.DataFrame.from_dict(rows, orient="index")
+
+
+def _narrow_enough(
+    summary: pd.DataFrame, target_width: Union[float, Dict[str, float]]
+) -> bool:
+    if isinstance(target_width, dict):
+        return all(
+            summary.loc[metric, "ci_width"] <= width
+            for metric, width in target_width.items()
+        )
+    return bool((summary["ci_width"] <= target_width).all())
+
+
+def _run_task(task) -> dict:
+    return run_configuration(*task)
+
+
+def run_replications(
+    algorithm_class: Type[Algorithm],
+    parameters: Optional[dict] = None,
+    workload_parameters: Optional[dict] = None,
+    seed: int = 1,
+    target_width: Union[float, Dict[str, float], None] = None,
+    confidence: float = 0.95,
+    min_replications: int = 10,
+    max_replications: int = 200,
+    batch_size: Optional[int] = None,
+    num_resamples: int = 1_000,
+    max_workers: Optional[int] = None,
+    engine: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Runs the algorithm on independent generate_workload draws in parallel and returns
+    mean, standard deviation and bootstrap confidence interval of every metric.
+
+    Replication i always uses the stream child_seed(seed, i), so different algorithms
+    run with the same seed see the same workloads. Replications run in batches, and
+    once at least min_replications are done the run stops early when every interval is
+    narrower than target_width (a number for all metrics or a dict per metric).
+    """
+    parameters = parameters or {}
+    workload_parameters = workload_parameters or {}
+    batch_size = batch_size or max_workers or os.cpu_count()
+
+    samples = {}
+    summary = pd.DataFrame()
+    count = 0
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        while count < max_replications:
+            size = max(batch_size, min_replications - count)
+            size = min(size, max_replications - count)
+            tasks = [
+                (
+                    algorithm_class,
+                    {
+                        **workload_parameters,
+                        **parameters,
+                        "seed": child_seed(seed, replication),
+                    },
+                    engine,
+                )
+                for replication in range(count, count + size)
+            ]
+            for metrics in executor.map(_run_task, tasks):
+                for metric, value in metrics.items():
+                    samples.setdefault(metric, []).append(value)
+            count += size
+
+            summary = summarize_replications(samples, confidence, num_resamples)
+            if (
+                target_width is not None
+                and count >= min_replications
+                and _narrow_enough(summary, target_width)
+            ):
+                break
+
+    return summary
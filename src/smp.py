@@ -0,0 +1,300 @@
+import copy
+import heapq
+import numpy as np
+
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from .algorithms import Algorithm
+from .trace import MIGRATION_OVERHEAD_ID, SWITCH_OVERHEAD_ID, ScheduleTrace
+from .workload import as_process_table
+
+
+class GlobalQueue:
+    """Load balancer with one FIFO run queue shared by all CPUs"""
+
+    def reset(self, num_cpus: int) -> None:
+        self.queue = deque()
+
+    def __len__(self) -> int:
+        return len(self.queue)
+
+    def enqueue(self, row: int, cpu: Optional[int]) -> None:
+        self.queue.append(row)
+
+    def waiting(self, cpu: int) -> bool:
+        return bool(self.queue)
+
+    def pick(self, cpu: int) -> Optional[int]:
+        return self.queue.popleft() if self.queue else None
+
+
+class WorkStealing:
+    """
+    Load balancer with one FIFO run queue per CPU. Arrivals are spread over the CPUs in
+    turn and preempted processes stay on their CPU. A CPU with an empty queue steals
+    the newest process of the longest queue.
+    """
+
+    def reset(self, num_cpus: int) -> None:
+        self.queues = [deque() for _ in range(num_cpus)]
+        self.count = 0
+        self.next_cpu = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def enqueue(self, row: int, cpu: Optional[int]) -> None:
+        if cpu is None:
+            cpu = self.next_cpu
+            self.next_cpu = (cpu + 1) % len(self.queues)
+        self.queues[cpu].append(row)
+        self.count += 1
+
+    def waiting(self, cpu: int) -> bool:
+        return bool(self.queues[cpu])
+
+    def pick(self, cpu: int) -> Optional[int]:
+        if not self.count:
+            return None
+
+        queue = self.queues[cpu]
+        if queue:
+            self.count -= 1
+            return queue.popleft()
+
+        victim = max(self.queues, key=len)
+        self.count -= 1
+        return victim.pop()
+
+
+LOAD_BALANCERS = {"global": GlobalQueue, "stealing": WorkStealing}
+
+
+class SymmetricMultiprocessing(Algorithm):
+    """
+    `num_cpus` CPUs scheduling round robin with `quantum` from the run queues of a load
+    balancer ("global" or "stealing", or an object with the interface of GlobalQueue).
+    Without a quantum every process runs to completion once it got a CPU. A CPU spends
+    switch_cost on every context switch and additionally migration_cost when the
+    process ran on another CPU before.
+
+    A CPU whose slice ends requeues its process and picks again before idle CPUs do,
+    so it keeps its process when nothing else waits for it. Steps are recorded per CPU,
+    get_steps returns all of them with a "cpu" key.
+    """
+
+    cacheable = False  # The per-CPU traces and metrics are not cached
+    # Whether a CPU keeps its process for several quanta while nothing needs the CPU,
+    # the schedule is the same as ending every quantum on its own
+    batch_quanta = True
+
+    def __init__(
+        self,
+        num_cpus: int = 4,
+        quantum: Optional[int] = None,
+        balancer="global",
+        switch_cost: int = 0,
+        migration_cost: int = 0,
+    ) -> None:
+        super().__init__("SMP", switch_cost)
+        self.migration_cost = migration_cost
+        self.num_cpus = num_cpus
+        self.quantum = quantum
+        self.balancer = (
+            LOAD_BALANCERS[balancer]() if isinstance(balancer, str) else balancer
+        )
+
+        self.cpu_traces = [ScheduleTrace() for _ in range(num_cpus)]
+        self.busy_times = np.zeros(num_cpus, dtype=np.int64)
+        self.overhead_times = np.zeros(num_cpus, dtype=np.int64)
+        self.cpu_context_switches = np.zeros(num_cpus, dtype=np.int64)
+        self.migrations = 0
+        self.makespan = 0
+
+    def reset(self) -> None:
+        super().reset()
+        for trace in self.cpu_traces:
+            trace.clear()
+
+    def clone(self) -> "SymmetricMultiprocessing":
+        # The per-CPU traces and the load balancer queues belong to one run each
+        clone = super().clone()
+        clone.balancer = copy.copy(self.balancer)
+        clone.cpu_traces = [ScheduleTrace() for _ in range(self.num_cpus)]
+        return clone
+
+    def schedule(self, processes) -> Tuple[int, int, np.ndarray]:
+        table = as_process_table(processes)
+        ids = table.ids.tolist()
+        arrival_times = table.arrival_times.tolist()
+        burst_times = table.burst_times.tolist()
+        arrival_order = np.argsort(table.arrival_times, kind="stable").tolist()
+        num_processes = len(table)
+
+        quantum = self.quantum
+        switch_cost = self.switch_cost
+        migration_cost = self.migration_cost
+        balancer = self.balancer
+        balancer.reset(self.num_cpus)
+        shared_queue = isinstance(balancer, GlobalQueue)
+        batch_quanta = self.batch_quanta
+        traces = self.cpu_traces if self.record_trace else None
+
+        remaining_times = list(burst_times)
+        wait_times = [0] * num_processes
+        response_times = [-1] * num_processes  # Wait until the first slice
+        last_cpus = [-1] * num_processes
+
+        running = [-1] * self.num_cpus  # Row of the process on each CPU
+        slice_sizes = [0] * self.num_cpus
+        last_rows = [-1] * self.num_cpus
+        busy_times = [0] * self.num_cpus
+        overhead_times = [0] * self.num_cpus
+        context_switches = [0] * self.num_cpus
+        migrations = 0
+
+        slice_ends = []  # Heap of (end time, cpu) of the running slices
+        idle = list(range(self.num_cpus))  # Heap, idle CPUs are filled lowest first
+        current_time = 0
+        next_arrival = 0
+
+        def dispatch(cpu: int) -> bool:
+            nonlocal migrations
+            row = balancer.pick(cpu)
+            if row is None:
+                return False
+
+            # Only count context switches if the process is different
+            start_time = current_time
+            if last_rows[cpu] != row:
+                last_rows[cpu] = row
+                context_switches[cpu] += 1
+                if switch_cost:
+                    if traces is not None:
+                        traces[cpu].append(SWITCH_OVERHEAD_ID, start_time, switch_cost)
+                    start_time += switch_cost
+            if last_cpus[row] != cpu:
+                if last_cpus[row] >= 0:
+                    migrations += 1
+                    if migration_cost:
+                        if traces is not None:
+                            traces[cpu].append(
+                                MIGRATION_OVERHEAD_ID, start_time, migration_cost
+                            )
+                        start_time += migration_cost
+                last_cpus[row] = cpu
+            overhead_times[cpu] += start_time - current_time
+            if response_times[row] < 0:
+                response_times[row] = start_time - arrival_times[row]
+
+            execution_time = remaining_times[row]
+            if quantum is not None and execution_time > quantum:
+                # Nothing else waits for this CPU, so the process keeps it for all
+                # quanta until an arrival may need it. With a shared queue the idle
+                # CPUs take the next arrivals, only one arriving right at a quantum
+                # boundary is queued before the process and takes over.
+                quanta = 1
+                if batch_quanta and not balancer.waiting(cpu):
+                    quanta = execution_time
+                    spare_cpus = len(idle) if shared_queue else 0
+                    for position in range(next_arrival, num_processes):
+                        until = arrival_times[arrival_order[position]] - start_time
+                        if not spare_cpus:
+                            quanta = max(-(-until // quantum), 1)
+                            break
+                        if until > 0 and until % quantum == 0:
+                            quanta = until // quantum
+                            break
+                        spare_cpus -= 1
+                execution_time = min(execution_time, quanta * quantum)
+
+            running[cpu] = row
+            slice_sizes[cpu] = execution_time
+            if traces is not None:
+                traces[cpu].append(ids[row], start_time, execution_time)
+            heapq.heappush(slice_ends, (start_time + execution_time, cpu))
+            return True
+
+        while next_arrival < num_processes or slice_ends:
+            # Next point in time where an arrival or the end of a slice happens
+            if slice_ends:
+                current_time = slice_ends[0][0]
+                if next_arrival < num_processes:
+                    current_time = min(
+                        current_time, arrival_times[arrival_order[next_arrival]]
+                    )
+            else:
+                current_time = arrival_times[arrival_order[next_arrival]]
+
+            while (
+                next_arrival < num_processes
+                and arrival_times[arrival_order[next_arrival]] <= current_time
+            ):
+                balancer.enqueue(arrival_order[next_arrival], None)
+                next_arrival += 1
+
+            while slice_ends and slice_ends[0][0] == current_time:
+                _, cpu = heapq.heappop(slice_ends)
+                row = running[cpu]
+                running[cpu] = -1
+                remaining_times[row] -= slice_sizes[cpu]
+                busy_times[cpu] += slice_sizes[cpu]
+
+                if remaining_times[row] > 0:
+                    balancer.enqueue(row, cpu)
+                else:
+                    wait_times[row] = (
+                        current_time - arrival_times[row] - burst_times[row]
+                    )
+                if not dispatch(cpu):
+                    heapq.heappush(idle, cpu)
+
+            while idle and len(balancer):
+                cpu = heapq.heappop(idle)
+                if not dispatch(cpu):
+                    heapq.heappush(idle, cpu)
+                    break
+
+        self.busy_times = np.array(busy_times, dtype=np.int64)
+        self.overhead_times = np.array(overhead_times, dtype=np.int64)
+        self.cpu_context_switches = np.array(context_switches, dtype=np.int64)
+        self.migrations = migrations
+        self.makespan = current_time
+
+        wait_times = np.array(wait_times, dtype=np.int64)
+        self._report_completions(table, wait_times, response_times)
+        return sum(context_switches), current_time, wait_times
+
+    def get_steps(self) -> List[Dict[str, int]]:
+        steps = [
+            {**step, "cpu": cpu}
+            for cpu, trace in enumerate(self.cpu_traces)
+            for step in trace.to_steps()
+        ]
+        steps.sort(key=lambda step: (step["start"], step["cpu"]))
+        return steps
+
+    def get_cpu_steps(self, cpu: int) -> List[Dict[str, int]]:
+        return self.cpu_traces[cpu].to_steps()
+
+    def get_cpu_trace(self, cpu: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # Read-only (ids, starts, sizes) arrays of the merged steps of one CPU
+        return self.cpu_traces[cpu].view()
+
+    def overhead_time(self, context_switches: int) -> int:
+        return (
+            context_switches * self.switch_cost + self.migrations * self.migration_cost
+        )
+
+    def get_cpu_metrics(self) -> dict:
+        """
+        Per-CPU utilization (by the processes), overhead time and context switches of
+        the last run, and migrations
+        """
+        return {
+            "utilization": self.busy_times / max(self.makespan, 1),
+            "overhead_times": self.overhead_times,
+            "context_switches": self.cpu_context_switches,
+            "migrations": self.migrations,
+        }
@@ -0,0 +1,57 @@
+from typing import Callable, Iterable, Iterator, Optional
+
+from .algorithms import Algorithm
+from .engines import ENGINE_CHUNK_SIZE
+from .metrics import StreamingMetrics
+from .workload import ProcessTable
+
+
+def iter_chunks(
+    processes: ProcessTable, chunk_size: int = ENGINE_CHUNK_SIZE
+) -> Iterator[ProcessTable]:
+    """Fixed-size slices of a table, for a memory-mapped table only these are read"""
+    for start in range(0, len(processes), chunk_size):
+        yield processes[start : start + chunk_size]
+
+
+def replay(
+    algorithm: Algorithm,
+    chunks: Iterable[ProcessTable],
+    add_step: Optional[Callable[[int, int, int], None]] = None,
+) -> Iterator[dict]:
+    """
+    Schedules a workload arriving as chunks (in workload order) and yields the metrics
+    of the processes finished so far after every chunk, the last ones cover everything.
+
+    Only the pending chunk and the queued processes are held in memory. Steps go to
+    add_step as they are scheduled, so pass a callback that writes them somewhere
+    instead of keeping them when the trace is larger than memory.
+    """
+    metrics = StreamingMetrics()
+    engine = algorithm.create_engine(add_step=add_step, sink=metrics)
+    for chunk in chunks:
+        engine.extend(chunk)
+        engine.advance()
+        yield metrics.metrics(
+            engine.context_switches,
+            engine.current_time,
+            algorithm.overhead_time(engine.context_switches),
+        )
+
+    engine.advance(final=True)
+    yield metrics.metrics(
+        engine.context_switches,
+        engine.current_time,
+        algorithm.overhead_time(engine.context_switches),
+    )
+
+
+def stream_schedule(
+    algorithm: Algorithm,
+    chunks: Iterable[ProcessTable],
+    add_step: Optional[Callable[[int, int, int], None]] = None,
+) -> dict:
+    """Metrics of a whole chunked workload, see replay"""
+    for metrics in replay(algorithm, chunks, add_step):
+        pass
+    return metrics
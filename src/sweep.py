@@ -0,0 +1,155 @@
+import itertools
+import json
+import os
+import random
+import numpy as np
+import pandas as pd
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, Optional, Type
+
+from .algorithms import Algorithm
+from .evaluation import evaluate
+from .workload import generate_workload
+
+# Configuration keys that go to generate_workload, everything else goes to the algorithm
+GENERATOR_PARAMETERS = (
+    "num_processes",
+    "mean_burst_time",
+    "std_dev_burst",
+    "percentage_high_priority",
+    "arrival_time_variation",
+    "seed",
+)
+
+
+def grid_search_space(space: dict) -> Iterator[dict]:
+    """Every combination of the value lists in `space`, generated lazily"""
+    names = list(space)
+    for values in itertools.product(*(space[name] for name in names)):
+        yield dict(zip(names, values))
+
+
+def random_search_space(space: dict, num_samples: int, seed: int = 1) -> Iterator[dict]:
+    """
+    `num_samples` random configurations. A list is sampled as choices, a (low, high)
+    tuple uniformly, as integers if both bounds are integers.
+    """
+    rng = random.Random(seed)
+    for _ in range(num_samples):
+        configuration = {}
+        for name, values in space.items():
+            if isinstance(values, tuple):
+                low, high = values
+                if isinstance(low, int) and isinstance(high, int):
+                    configuration[name] = rng.randint(low, high)
+                else:
+                    configuration[name] = rng.uniform(low, high)
+            else:
+                configuration[name] = rng.choice(values)
+        yield configuration
+
+
+def _json_value(value):
+    # Spaces built with NumPy (e.g. np.arange) yield NumPy scalars
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} values cannot be stored in a sweep")
+
+
+def configuration_key(algorithm_class: Type[Algorithm], configuration: dict) -> str:
+    return json.dumps(
+        {"algorithm": algorithm_class.__name__, **configuration},
+        sort_keys=True,
+        default=_json_value,
+    )
+
+
+def run_configuration(
+    algorithm_class: Type[Algorithm],
+    configuration: dict,
+    engine: Optional[str] = None,
+) -> dict:
+    """Generates the workload of one configuration and returns the metrics on it"""
+    generator_parameters = {
+        name: value
+        for name, value in configuration.items()
+        if name in GENERATOR_PARAMETERS
+    }
+    algorithm_parameters = {
+        name: value
+        for name, value in configuration.items()
+        if name not in GENERATOR_PARAMETERS
+    }
+
+    # Every configuration gets a reproducible workload from its own random stream
+    generator_parameters.setdefault("seed", 1)
+    workload = generate_workload(**generator_parameters)
+
+    return evaluate(algorithm_class, algorithm_parameters, workload, engine)
+
+
+def _run_task(task) -> dict:
+    return run_configuration(*task)
+
+
+def _completed_keys(results_path: str) -> set:
+    if not os.path.exists(results_path):
+        return set()
+    with open(results_path) as results_file:
+        return {json.loads(line)["key"] for line in results_file if line.strip()}
+
+
+def run_sweep(
+    algorithm_class: Type[Algorithm],
+    configurations: Iterable[dict],
+    results_path: str,
+    max_workers: Optional[int] = None,
+    batch_size: int = 256,
+    engine: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Runs every configuration on a process pool and appends one JSON line of metrics per
+    run to `results_path`. Configurations already in the file are skipped, so an
+    interrupted sweep continues where it stopped. Configurations are consumed lazily in
+    batches and rows are written as soon as a batch is done, so memory stays bounded by
+    the batch size. Returns the whole results table.
+    """
+    completed = _completed_keys(results_path)
+    pending = (
+        configuration
+        for configuration in configurations
+        if configuration_key(algorithm_class, configuration) not in completed
+    )
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor, open(
+        results_path, "a"
+    ) as results_file:
+        while True:
+            batch = list(itertools.islice(pending, batch_size))
+            if not batch:
+                break
+
+            tasks = [
+                (algorithm_class, configuration, engine) for configuration in batch
+            ]
+            for configuration, metrics in zip(batch, executor.map(_run_task, tasks)):
+                row = {
+                    "key": configuration_key(algorithm_class, configuration),
+                    "algorithm": algorithm_class.__name__,
+                    **configuration,
+                    **{
+                        name: np.asarray(value).item()
+                        for name, value in metrics.items()
+                    },
+                }
+                results_file.write(json.dumps(row, default=_json_value) + "\n")
+            results_file.flush()
+
+    return load_sweep(results_path)
+
+
+def load_sweep(results_path: str) -> pd.DataFrame:
+    if not os.path.exists(results_path) or os.path.getsize(results_path) == 0:
+        return pd.DataFrame()
+    return pd.read_json(results_path, lines=True)
@@ -0,0 +1,144 @@
+import numpy as np
+
+from typing import Dict, List, Tuple
+
+# Pseudo process ids of the overhead segments engines insert with a cost model
+SWITCH_OVERHEAD_ID = -1
+MIGRATION_OVERHEAD_ID = -2
+
+
+class ScheduleTrace:
+    """
+    Schedule slices (id, start, size) stored in growable int64 arrays.
+
+    A slice of the same process that starts where the previous one ended is merged
+    into it on append, so the trace only holds what get_steps used to return.
+    The last slice is kept as Python ints until a different slice arrives, which keeps
+    merging as cheap as an attribute update.
+
+    Views handed out by view() never change: once a write would touch slots a view
+    shows (after clear(), truncate() or a merge into the last slice), the trace moves
+    to new arrays first.
+    """
+
+    def __init__(self, capacity: int = 1024) -> None:
+        self._ids = np.empty(capacity, dtype=np.int64)
+        self._starts = np.empty(capacity, dtype=np.int64)
+        self._sizes = np.empty(capacity, dtype=np.int64)
+        self._count = 0  # Slices written to the arrays
+        self._last = None  # [id, start, size] of the slice that may still grow
+        self._shared = 0  # Slots visible through views, written only after a copy
+
+    def __len__(self) -> int:
+        return self._count + (self._last is not None)
+
+    def append(self, id: int, start: int, size: int) -> None:
+        last = self._last
+        if last is not None and last[0] == id and last[1] + last[2] == start:
+            last[2] += size
+            return
+
+        if last is not None:
+            self._write(last[0], last[1], last[2])
+        self._last = [id, start, size]
+
+    def extend(self, ids: np.ndarray, starts: np.ndarray, sizes: np.ndarray) -> None:
+        ids = np.asarray(ids, dtype=np.int64)
+        starts = np.asarray(starts, dtype=np.int64)
+        sizes = np.asarray(sizes, dtype=np.int64)
+        if len(ids) == 0:
+            return
+
+        # Merge runs of contiguous slices of the same process before storing them
+        continues = (ids[1:] == ids[:-1]) & (starts[1:] == starts[:-1] + sizes[:-1])
+        heads = np.flatnonzero(np.concatenate(([True], ~continues)))
+        ids = ids[heads]
+        starts = starts[heads]
+        sizes = np.add.reduceat(sizes, heads)
+
+        # The first slice may still continue the last one already stored
+        self.append(int(ids[0]), int(starts[0]), int(sizes[0]))
+        if len(ids) == 1:
+            return
+
+        last = self._last
+        self._write(last[0], last[1], last[2])
+        count = len(ids) - 2
+        self._reserve(count)
+        if self._count < self._shared:
+            self._detach()
+        end = self._count + count
+        self._ids[self._count : end] = ids[1:-1]
+        self._starts[self._count : end] = starts[1:-1]
+        self._sizes[self._count : end] = sizes[1:-1]
+        self._count = end
+        self._last = [int(ids[-1]), int(starts[-1]), int(sizes[-1])]
+
+    def clear(self) -> None:
+        self._count = 0
+        self._last = None
+
+    def mark(self) -> tuple:
+        """Position to truncate back to, the slices up to it are never changed"""
+        last = None if self._last is None else tuple(self._last)
+        return self._count, last
+
+    def truncate(self, mark: tuple) -> None:
+        # Drops everything appended after mark() returned it
+        count, last = mark
+        self._count = count
+        self._last = None if last is None else list(last)
+
+    def view(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Returns read-only (ids, starts, sizes) arrays without copying the trace"""
+        columns = self._columns()
+        self._shared = max(self._shared, len(columns[0]))
+        for column in columns:
+            column.flags.writeable = False
+        return columns
+
+    def to_steps(self) -> List[Dict[str, int]]:
+        ids, starts, sizes = self._columns()
+        return [
+            {"id": id, "start": start, "size": size}
+            for id, start, size in zip(ids.tolist(), starts.tolist(), sizes.tolist())
+        ]
+
+    def _columns(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # All slices including the last one, in the arrays of the trace
+        count = self._count
+        if self._last is not None:
+            self._reserve(1)
+            if count < self._shared:
+                self._detach()
+            self._ids[count], self._starts[count], self._sizes[count] = self._last
+            count += 1
+        return self._ids[:count], self._starts[:count], self._sizes[:count]
+
+    def _write(self, id: int, start: int, size: int) -> None:
+        if self._count == len(self._ids):
+            self._reserve(1)
+        count = self._count
+        if count < self._shared:
+            self._detach()
+        self._ids[count] = id
+        self._starts[count] = start
+        self._sizes[count] = size
+        self._count = count + 1
+
+    def _reserve(self, count: int) -> None:
+        needed = self._count + count
+        if needed <= len(self._ids):
+            return
+
+        # Grow geometrically, earlier views keep pointing to the old arrays
+        self._detach(max(needed, 2 * len(self._ids)))
+
+    def _detach(self, capacity: int = 0) -> None:
+        # Moves the slices to new arrays, views keep the old ones
+        capacity = max(capacity, len(self._ids))
+        for name in ("_ids", "_starts", "_sizes"):
+            column = np.empty(capacity, dtype=np.int64)
+            column[: self._count] = getattr(self, name)[: self._count]
+            setattr(self, name, column)
+        self._shared = 0
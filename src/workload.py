@@ -0,0 +1,455 @@
+import hashlib
+import json
+import os
+import numpy as np
+
+from typing import Iterator, List, Optional, Union
+
+# Priorities are stored as small integers, the index into this tuple
+PRIORITIES = ("low", "high")
+PRIORITY_LOW = 0
+PRIORITY_HIGH = 1
+
+# Processes drawn from one random stream in generate_workload
+GENERATOR_CHUNK_SIZE = 1_000_000
+
+# On-disk workloads are a directory with one .npy file per column and a header
+WORKLOAD_FORMAT = "process-table"
+WORKLOAD_FORMAT_VERSION = 1
+WORKLOAD_HEADER = "header.json"
+WORKLOAD_COLUMNS = {
+    "ids": np.int64,
+    "arrival_times": np.int64,
+    "burst_times": np.int64,
+    "priorities": np.int8,
+}
+
+
+class SequenceDiagrammProcess:
+    def __init__(
+        self,
+        id: int,
+        arrival_time: int,
+        burst_time: int,
+        priority: str = "low",
+        bursts: Optional[List[int]] = None,
+    ) -> None:
+        self.id = id
+        self.arrival_time = arrival_time
+        self.burst_time = burst_time  # Total CPU time, the sum of the CPU bursts
+        self.priority = priority
+        # Alternating CPU and I/O bursts (CPU, I/O, ..., CPU), None for one CPU burst
+        self.bursts = bursts
+
+
+def _read_only(values, dtype) -> np.ndarray:
+    # A view is frozen, so arrays handed in by the caller stay writeable for them
+    column = np.asarray(values, dtype=dtype).view()
+    column.flags.writeable = False
+    return column
+
+
+class BurstSequences:
+    """
+    Alternating CPU and I/O bursts of the processes of a workload, each sequence starts
+    and ends with a CPU burst. The bursts of row i are values[offsets[i]:offsets[i + 1]],
+    so slicing rows only slices the offsets and shares the values.
+    """
+
+    def __init__(
+        self, offsets: np.ndarray, values: np.ndarray, validate: bool = True
+    ) -> None:
+        self.offsets = _read_only(offsets, np.int64)
+        self.values = _read_only(values, np.int64)
+
+        if len(self.offsets) == 0:
+            raise ValueError("Burst sequences need at least the offset 0")
+        # Checking reads every offset, so slices and trusted files skip it
+        if validate and np.any(np.diff(self.offsets) % 2 == 0):
+            raise ValueError("Every burst sequence must have an odd length")
+
+    @classmethod
+    def single(cls, burst_times: np.ndarray) -> "BurstSequences":
+        """One CPU burst per process"""
+        return cls(np.arange(len(burst_times) + 1), burst_times)
+
+    @classmethod
+    def from_processes(
+        cls, processes: List[SequenceDiagrammProcess]
+    ) -> "BurstSequences":
+        sequences = [
+            process.bursts if process.bursts is not None else [process.burst_time]
+            for process in processes
+        ]
+        offsets = np.zeros(len(sequences) + 1, dtype=np.int64)
+        np.cumsum([len(sequence) for sequence in sequences], out=offsets[1:])
+        values = np.fromiter(
+            (burst for sequence in sequences for burst in sequence),
+            dtype=np.int64,
+            count=int(offsets[-1]),
+        )
+        return cls(offsets, values)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[List[int], "BurstSequences"]:
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step != 1:
+                raise ValueError("Burst sequences can only be sliced contiguously")
+            return BurstSequences(
+                self.offsets[start : max(stop, start) + 1], self.values, validate=False
+            )
+        return self.values[self.offsets[key] : self.offsets[key + 1]].tolist()
+
+    def _totals(self, io: bool) -> np.ndarray:
+        # Sums of the CPU (even positions) or I/O bursts (odd positions) of every row
+        start, stop = int(self.offsets[0]), int(self.offsets[-1])
+        values = self.values[start:stop]
+        lengths = np.diff(self.offsets)
+        positions = np.arange(len(values)) - np.repeat(
+            self.offsets[:-1] - start, lengths
+        )
+        selected = np.where(positions % 2 == io, values, 0)
+        rows = np.repeat(np.arange(len(self)), lengths)
+        totals = np.bincount(rows, weights=selected, minlength=len(self))
+        return totals.astype(np.int64)
+
+    def cpu_times(self) -> np.ndarray:
+        return self._totals(io=False)
+
+    def io_times(self) -> np.ndarray:
+        return self._totals(io=True)
+
+
+class ProcessTable:
+    """
+    Columnar workload holding id, arrival time, burst time and priority in NumPy arrays.
+
+    Indexing with an integer or iterating returns SequenceDiagrammProcess objects built
+    from the row, so code written against lists of processes keeps working. Slicing
+    returns another ProcessTable sharing the same memory.
+
+    The columns are read-only views, so one table can be shared by several schedulers
+    and algorithms at the same time without copying it.
+
+    Processes alternating CPU and I/O carry their BurstSequences in `bursts`, the burst
+    time is then the total CPU time. Without it every process is one CPU burst.
+    """
+
+    def __init__(
+        self,
+        ids: np.ndarray,
+        arrival_times: np.ndarray,
+        burst_times: np.ndarray,
+        priorities: np.ndarray,
+        bursts: Optional[BurstSequences] = None,
+        validate: bool = True,
+    ) -> None:
+        self.ids = _read_only(ids, np.int64)
+        self.arrival_times = _read_only(arrival_times, np.int64)
+        self.burst_times = _read_only(burst_times, np.int64)
+        self.priorities = _read_only(priorities, np.int8)
+        self.bursts = bursts
+
+        lengths = {
+            len(self.ids),
+            len(self.arrival_times),
+            len(self.burst_times),
+            len(self.priorities),
+        }
+        if len(lengths) != 1:
+            raise ValueError("All columns of a ProcessTable must have the same length")
+        if bursts is not None and len(bursts) != len(self.ids):
+            raise ValueError("Every process needs one burst sequence")
+        # Summing every burst reads all of them, so slices and trusted files skip it
+        if (
+            validate
+            and bursts is not None
+            and np.any(bursts.cpu_times() != self.burst_times)
+        ):
+            raise ValueError("Burst times must be the CPU time of the burst sequences")
+
+    @classmethod
+    def from_processes(cls, processes: List[SequenceDiagrammProcess]) -> "ProcessTable":
+        try:
+            priorities = [PRIORITIES.index(p.priority) for p in processes]
+        except ValueError:
+            raise ValueError(f"Priorities must be one of {PRIORITIES}") from None
+
+        bursts = None
+        if any(getattr(p, "bursts", None) is not None for p in processes):
+            bursts = BurstSequences.from_processes(processes)
+
+        return cls(
+            np.fromiter((p.id for p in processes), dtype=np.int64),
+            np.fromiter((p.arrival_time for p in processes), dtype=np.int64),
+            np.fromiter((p.burst_time for p in processes), dtype=np.int64),
+            np.array(priorities, dtype=np.int8),
+            bursts,
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(
+        self, key: Union[int, slice]
+    ) -> Union[SequenceDiagrammProcess, "ProcessTable"]:
+        if isinstance(key, slice):
+            return ProcessTable(
+                self.ids[key],
+                self.arrival_times[key],
+                self.burst_times[key],
+                self.priorities[key],
+                self.bursts[key] if self.bursts is not None else None,
+                validate=False,  # Rows of a valid table stay valid
+            )
+        return SequenceDiagrammProcess(
+            id=int(self.ids[key]),
+            arrival_time=int(self.arrival_times[key]),
+            burst_time=int(self.burst_times[key]),
+            priority=PRIORITIES[self.priorities[key]],
+            bursts=self.bursts[key] if self.bursts is not None else None,
+        )
+
+    def __iter__(self) -> Iterator[SequenceDiagrammProcess]:
+        for row, (id, arrival_time, burst_time, priority) in enumerate(
+            zip(
+                self.ids.tolist(),
+                self.arrival_times.tolist(),
+                self.burst_times.tolist(),
+                self.priorities.tolist(),
+            )
+        ):
+            bursts = self.bursts[row] if self.bursts is not None else None
+            yield SequenceDiagrammProcess(
+                id, arrival_time, burst_time, PRIORITIES[priority], bursts
+            )
+
+    def __repr__(self) -> str:
+        return f"ProcessTable({len(self)} processes)"
+
+    def to_processes(self) -> List[SequenceDiagrammProcess]:
+        return list(self)
+
+
+def as_process_table(
+    processes: Union[ProcessTable, List[SequenceDiagrammProcess]],
+) -> ProcessTable:
+    if isinstance(processes, ProcessTable):
+        return processes
+    return ProcessTable.from_processes(processes)
+
+
+def has_io_bursts(
+    processes: Union[ProcessTable, List[SequenceDiagrammProcess]],
+) -> bool:
+    """Whether a workload carries burst sequences, only the "io" engines follow them"""
+    if isinstance(processes, ProcessTable):
+        return processes.bursts is not None
+    return any(getattr(process, "bursts", None) is not None for process in processes)
+
+
+def workload_digest(processes: ProcessTable) -> str:
+    """Hash of the contents of a workload, equal workloads have equal digests"""
+    digest = hashlib.blake2b(digest_size=16)
+    columns = [
+        processes.ids,
+        processes.arrival_times,
+        processes.burst_times,
+        processes.priorities,
+    ]
+    if processes.bursts is not None:
+        # Offsets relative to the first row, so slices hash like copies
+        offsets = processes.bursts.offsets
+        columns.append(offsets - offsets[0])
+        columns.append(processes.bursts.values[offsets[0] : offsets[-1]])
+    for column in columns:
+        # Hashed from the buffer, a (memory mapped) column is not copied
+        digest.update(memoryview(np.ascontiguousarray(column)))
+        digest.update(b"|")
+    return digest.hexdigest()
+
+
+def child_seed(
+    seed: Union[int, np.random.SeedSequence, None], index: int
+) -> np.random.SeedSequence:
+    """
+    Seed of the independent random stream number `index` derived from `seed`. Unlike
+    SeedSequence.spawn() it does not depend on how many streams were derived before.
+    """
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    return np.random.SeedSequence(
+        entropy=seed.entropy,
+        spawn_key=seed.spawn_key + (index,),
+        pool_size=seed.pool_size,
+    )
+
+
+def generate_workload(
+    num_processes: int = 100,
+    mean_burst_time: int = 250,
+    std_dev_burst: float = 600,
+    percentage_high_priority: float = 0.2,
+    arrival_time_variation: float = 100,
+    seed: Union[int, np.random.SeedSequence, None] = None,
+    chunk_size: Optional[int] = GENERATOR_CHUNK_SIZE,
+) -> ProcessTable:
+    """
+    Vectorized version of create_processes with the same distributions, but drawn from
+    np.random.Generator streams instead of the global NumPy state.
+
+    Every chunk of `chunk_size` processes has its own stream derived from `seed`, so
+    the same seed and chunk size always give the same workload, and chunks can be
+    generated independently. Pass SeedSequence.spawn() children as seeds to give
+    parallel runs independent reproducible workloads.
+    """
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+
+    chunk_size = chunk_size or max(num_processes, 1)
+    bursts, priorities, jitters, gaps = [], [], [], []
+    for chunk, start in enumerate(range(0, num_processes, chunk_size)):
+        size = min(chunk_size, num_processes - start)
+        rng = np.random.default_rng(child_seed(seed, chunk))
+
+        bursts.append(np.rint(rng.normal(mean_burst_time, std_dev_burst, size)))
+        priorities.append(rng.random(size) < percentage_high_priority)
+        jitters.append(
+            rng.uniform(-arrival_time_variation, arrival_time_variation, size)
+        )
+        gaps.append(np.rint(rng.uniform(0, 25 * arrival_time_variation, size)))
+
+    if not bursts:
+        return ProcessTable([], [], [], [])
+
+    burst_times = np.maximum(np.concatenate(bursts), 1).astype(np.int64)
+
+    # Anpassung der Ankunftszeit, um Clusterbildung zu simulieren
+    gaps = np.maximum(np.concatenate(gaps), 0).astype(np.int64)
+    base_arrival_times = np.cumsum(gaps)
+    base_arrival_times -= gaps
+    arrival_times = np.trunc(base_arrival_times + np.concatenate(jitters))
+    arrival_times = np.maximum(arrival_times, 0).astype(np.int64)
+
+    return ProcessTable(
+        np.arange(1, num_processes + 1),
+        arrival_times,
+        burst_times,
+        np.concatenate(priorities).astype(np.int8) * PRIORITY_HIGH,
+    )
+
+
+def generate_io_bursts(
+    processes: Union[ProcessTable, List[SequenceDiagrammProcess]],
+    mean_io_bursts: float = 2,
+    mean_io_time: float = 50,
+    seed: Union[int, np.random.SeedSequence, None] = None,
+) -> ProcessTable:
+    """
+    Same workload with every CPU burst split into pieces separated by I/O bursts. The
+    number of I/O bursts is Poisson distributed (at most one less than the burst time),
+    I/O times are exponential and at least 1, the CPU time of every process stays.
+    """
+    table = as_process_table(processes)
+    rng = np.random.default_rng(seed)
+    burst_times = table.burst_times
+
+    num_io = np.minimum(rng.poisson(mean_io_bursts, len(table)), burst_times - 1)
+    num_io = np.maximum(num_io, 0)
+    num_cpu = num_io + 1
+
+    # Every CPU piece gets 1, the rest is cut at sorted random points per process
+    rows = np.repeat(np.arange(len(table)), num_cpu)
+    extra = (burst_times - num_cpu)[rows]
+    cuts = np.floor(rng.random(len(rows)) * (extra + 1)).astype(np.int64)
+    first = np.zeros(len(table) + 1, dtype=np.int64)
+    np.cumsum(num_cpu, out=first[1:])
+    cuts[first[:-1]] = 0  # The first cut of every process is its start
+    cuts = cuts[np.lexsort((cuts, rows))]
+    ends = np.append(cuts[1:], 0)
+    ends[first[1:] - 1] = extra[first[1:] - 1]
+    cpu_bursts = ends - cuts + 1
+
+    io_bursts = np.maximum(np.rint(rng.exponential(mean_io_time, int(num_io.sum()))), 1)
+
+    # Interleave CPU, I/O, ..., CPU per process
+    offsets = np.zeros(len(table) + 1, dtype=np.int64)
+    np.cumsum(2 * num_io + 1, out=offsets[1:])
+    values = np.empty(int(offsets[-1]), dtype=np.int64)
+    positions = np.arange(len(values)) - np.repeat(offsets[:-1], 2 * num_io + 1)
+    values[positions % 2 == 0] = cpu_bursts
+    values[positions % 2 == 1] = io_bursts
+
+    return ProcessTable(
+        table.ids,
+        table.arrival_times,
+        table.burst_times,
+        table.priorities,
+        BurstSequences(offsets, values),
+    )
+
+
+def save_workload(
+    processes: Union[ProcessTable, List[SequenceDiagrammProcess]], path: str
+) -> None:
+    """Writes the columns as .npy files into the directory `path`, the header last"""
+    table = as_process_table(processes)
+    os.makedirs(path, exist_ok=True)
+    for name in WORKLOAD_COLUMNS:
+        np.save(os.path.join(path, f"{name}.npy"), getattr(table, name))
+
+    # Burst sequences are optional, stored with offsets starting at 0
+    bursts = table.bursts
+    if bursts is not None:
+        start, stop = int(bursts.offsets[0]), int(bursts.offsets[-1])
+        np.save(os.path.join(path, "burst_offsets.npy"), bursts.offsets - start)
+        np.save(os.path.join(path, "burst_values.npy"), bursts.values[start:stop])
+
+    header = {
+        "format": WORKLOAD_FORMAT,
+        "version": WORKLOAD_FORMAT_VERSION,
+        "num_processes": len(table),
+        "columns": {
+            name: np.dtype(dtype).str for name, dtype in WORKLOAD_COLUMNS.items()
+        },
+        "bursts": bursts is not None,
+    }
+    with open(os.path.join(path, WORKLOAD_HEADER), "w") as header_file:
+        json.dump(header, header_file, indent=2)
+
+
+def load_workload(path: str, mmap: bool = True) -> ProcessTable:
+    """
+    Opens a workload written by save_workload. With mmap the columns are memory mapped
+    read-only, so even huge workloads open instantly and are paged in when read.
+    """
+    with open(os.path.join(path, WORKLOAD_HEADER)) as header_file:
+        header = json.load(header_file)
+    if (
+        header.get("format") != WORKLOAD_FORMAT
+        or header.get("version") != WORKLOAD_FORMAT_VERSION
+    ):
+        raise ValueError(f"{path} is not a version {WORKLOAD_FORMAT_VERSION} workload")
+
+    columns = {}
+    for name, dtype in WORKLOAD_COLUMNS.items():
+        column = np.load(
+            os.path.join(path, f"{name}.npy"), mmap_mode="r" if mmap else None
+        )
+        if column.dtype != dtype or len(column) != header["num_processes"]:
+            raise ValueError(f"Column {name} of {path} does not match its header")
+        columns[name] = column
+
+    if header.get("bursts"):
+        columns["bursts"] = BurstSequences(
+            *(
+                np.load(os.path.join(path, name), mmap_mode="r" if mmap else None)
+                for name in ("burst_offsets.npy", "burst_values.npy")
+            ),
+            validate=False,
+        )
+    # The file was written from a valid table, checking the bursts would read them all
+    return ProcessTable(**columns, validate=False)
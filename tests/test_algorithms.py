@@ -0,0 +1,223 @@
+"""
+Small schedules worked out by hand for the algorithms without a second engine to
+compare against, plus invariants every schedule must keep on random workloads.
+"""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("manim")  # src.algorithms imports it for the animations
+
+from src.algorithms import (
+    CompletelyFair,
+    MultiLevelFeedbackQueue,
+    ShortestJobFirst,
+    ShortestRemainingTimeFirst,
+)
+from src.trace import SWITCH_OVERHEAD_ID
+from src.workload import PRIORITY_HIGH, PRIORITY_LOW, ProcessTable, generate_workload
+
+# Algorithms checked for the invariants, each with and without a context switch cost
+ALGORITHMS = [
+    lambda switch_cost: ShortestJobFirst(switch_cost),
+    lambda switch_cost: ShortestRemainingTimeFirst(switch_cost),
+    lambda switch_cost: CompletelyFair(switch_cost=switch_cost),
+    lambda switch_cost: MultiLevelFeedbackQueue((2, 4, 8), 40, switch_cost),
+]
+
+
+def workload(arrival_times, burst_times, priorities=None) -> ProcessTable:
+    if priorities is None:
+        priorities = [PRIORITY_LOW] * len(arrival_times)
+    return ProcessTable(
+        np.arange(1, len(arrival_times) + 1), arrival_times, burst_times, priorities
+    )
+
+
+def steps(*rows) -> list:
+    return [{"id": id, "start": start, "size": size} for id, start, size in rows]
+
+
+def assert_schedule(algorithm, processes, expected_steps, expected_waits) -> None:
+    _, current_time, wait_times = algorithm.run(processes)
+    assert algorithm.get_steps() == expected_steps
+    assert wait_times.tolist() == expected_waits
+    last = expected_steps[-1]
+    assert current_time == last["start"] + last["size"]
+
+
+def test_shortest_job_first_runs_the_shortest_arrived_burst():
+    # P1 runs alone, then P3 is shortest and P2 beats P4 by its earlier arrival
+    processes = workload([0, 2, 4, 5], [7, 4, 1, 4])
+    assert_schedule(
+        ShortestJobFirst(),
+        processes,
+        steps((1, 0, 7), (3, 7, 1), (2, 8, 4), (4, 12, 4)),
+        [0, 6, 3, 7],
+    )
+
+
+def test_shortest_remaining_time_first_preempts_for_shorter_arrivals():
+    processes = workload([0, 2, 4, 5], [7, 4, 1, 4])
+    algorithm = ShortestRemainingTimeFirst()
+    assert_schedule(
+        algorithm,
+        processes,
+        steps((1, 0, 2), (2, 2, 2), (3, 4, 1), (2, 5, 2), (4, 7, 4), (1, 11, 5)),
+        [9, 1, 0, 2],
+    )
+    assert algorithm.run(processes)[0] == 6
+
+
+def test_shortest_remaining_time_first_keeps_the_cpu_on_ties():
+    # P2 arrives with as much left as P1, which keeps running without a switch
+    algorithm = ShortestRemainingTimeFirst()
+    assert_schedule(
+        algorithm, workload([0, 2], [4, 2]), steps((1, 0, 4), (2, 4, 2)), [0, 2]
+    )
+    assert algorithm.run(workload([0, 2], [4, 2]))[0] == 2
+
+
+def test_switch_cost_is_recorded_before_every_dispatch():
+    assert_schedule(
+        ShortestJobFirst(switch_cost=1),
+        workload([0, 0], [3, 2]),
+        steps(
+            (SWITCH_OVERHEAD_ID, 0, 1),
+            (2, 1, 2),
+            (SWITCH_OVERHEAD_ID, 3, 1),
+            (1, 4, 3),
+        ),
+        [4, 1],
+    )
+
+
+def test_completely_fair_shares_the_target_latency_by_weight():
+    # Weights 1024 and 3121 split the 24 unit period into slices of 5 and 18. After
+    # its slice each process has the larger vruntime, so they alternate.
+    processes = workload([0, 0], [100, 100], [PRIORITY_LOW, PRIORITY_HIGH])
+    algorithm = CompletelyFair(min_granularity=3, target_latency=24)
+    _, current_time, wait_times = algorithm.run(processes)
+    assert algorithm.get_steps()[:6] == steps(
+        (1, 0, 5), (2, 5, 18), (1, 23, 5), (2, 28, 18), (1, 46, 5), (2, 51, 18)
+    )
+    # P2 finishes its last 10 units at 130, P1 then runs alone
+    assert algorithm.get_steps()[-2:] == steps((2, 120, 10), (1, 130, 70))
+    assert wait_times.tolist() == [100, 30]
+    assert current_time == 200
+
+
+def test_completely_fair_equal_weights_round_robin_with_equal_slices():
+    # Four equal processes get 24 / 4 = 6 units each, the rest runs in FIFO order
+    algorithm = CompletelyFair(min_granularity=3, target_latency=24)
+    assert_schedule(
+        algorithm,
+        workload([0, 0, 0, 0], [10, 10, 10, 10]),
+        steps(
+            (1, 0, 6),
+            (2, 6, 6),
+            (3, 12, 6),
+            (4, 18, 6),
+            (1, 24, 4),
+            (2, 28, 4),
+            (3, 32, 4),
+            (4, 36, 4),
+        ),
+        [18, 22, 26, 30],
+    )
+
+
+def test_completely_fair_stretches_the_period_to_the_minimum_granularity():
+    # Ten runnable processes need a period of 10 * 4, so each slice is 4 instead of 2
+    algorithm = CompletelyFair(min_granularity=4, target_latency=20)
+    algorithm.run(workload([0] * 10, [8] * 10))
+    assert algorithm.get_steps()[:10] == steps(
+        *((id, 4 * (id - 1), 4) for id in range(1, 11))
+    )
+
+
+def test_multi_level_feedback_queue_demotes_after_a_full_quantum():
+    # Both use up the level 0 quantum and continue round robin on level 1
+    assert_schedule(
+        MultiLevelFeedbackQueue(quanta=(2, 4)),
+        workload([0, 1], [7, 3]),
+        steps((1, 0, 2), (2, 2, 2), (1, 4, 4), (2, 8, 1), (1, 9, 1)),
+        [3, 5],
+    )
+
+
+def test_multi_level_feedback_queue_arrivals_preempt_lower_levels():
+    # P2 preempts P1 on level 1, which then finishes the rest of its quantum
+    algorithm = MultiLevelFeedbackQueue(quanta=(2, 8))
+    assert_schedule(
+        algorithm,
+        workload([0, 3], [10, 1]),
+        steps((1, 0, 3), (2, 3, 1), (1, 4, 7)),
+        [1, 0],
+    )
+    assert algorithm.run(workload([0, 3], [10, 1]))[0] == 3
+
+
+def test_multi_level_feedback_queue_boost_moves_everything_to_level_0():
+    processes = workload([0, 0, 0], [3, 3, 3])
+    # Without a boost the demoted processes finish on level 1 one after another
+    assert_schedule(
+        MultiLevelFeedbackQueue(quanta=(1, 2)),
+        processes,
+        steps((1, 0, 1), (2, 1, 1), (3, 2, 1), (1, 3, 2), (2, 5, 2), (3, 7, 2)),
+        [2, 4, 6],
+    )
+    # The boosts at 5 and 8 put P2 and P3 back on level 0 with its short quantum
+    assert_schedule(
+        MultiLevelFeedbackQueue(quanta=(1, 2), boost_interval=4),
+        processes,
+        steps(
+            (1, 0, 1),
+            (2, 1, 1),
+            (3, 2, 1),
+            (1, 3, 2),
+            (2, 5, 1),
+            (3, 6, 1),
+            (2, 7, 1),
+            (3, 8, 1),
+        ),
+        [2, 5, 6],
+    )
+
+
+@pytest.mark.parametrize("switch_cost", [0, 2])
+@pytest.mark.parametrize("make", ALGORITHMS)
+def test_schedule_invariants(make, switch_cost):
+    for seed in range(20):
+        processes = generate_workload(
+            80,
+            mean_burst_time=15,
+            std_dev_burst=15,
+            arrival_time_variation=1,
+            seed=seed,
+        )
+        algorithm = make(switch_cost)
+        _, current_time, wait_times = algorithm.run(processes)
+        schedule = algorithm.get_steps()
+
+        # One step at a time, none before its process arrived
+        ends = [step["start"] + step["size"] for step in schedule]
+        assert all(end <= step["start"] for end, step in zip(ends, schedule[1:]))
+        assert current_time == ends[-1]
+
+        run_times = np.zeros(len(processes), dtype=np.int64)
+        completion_times = np.zeros(len(processes), dtype=np.int64)
+        for step, end in zip(schedule, ends):
+            if step["id"] == SWITCH_OVERHEAD_ID:
+                assert step["size"] == switch_cost
+                continue
+            row = step["id"] - 1
+            assert step["start"] >= processes.arrival_times[row]
+            run_times[row] += step["size"]
+            completion_times[row] = end
+
+        np.testing.assert_array_equal(run_times, processes.burst_times)
+        np.testing.assert_array_equal(
+            wait_times,
+            completion_times - processes.arrival_times - processes.burst_times,
+        )
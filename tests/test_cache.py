@@ -0,0 +1,132 @@
+"""The on-disk result cache must be transparent: a hit gives exactly a fresh run."""
+
+import os
+
+import numpy as np
+import pytest
+
+pytest.importorskip("manim")  # src.algorithms imports it for the animations
+
+from src import cache as cache_module
+from src.algorithms import RoundRobin, Scheduler
+from src.cache import ResultCache, default_cache
+from src.workload import generate_workload
+
+WORKLOAD = generate_workload(300, seed=1)
+
+
+def run(result_cache, algorithm, engine="event", record_trace=True):
+    scheduler = Scheduler()
+    scheduler.cache = result_cache
+    scheduler.set_processes(WORKLOAD)
+    scheduler.run_algorithm(
+        algorithm, display=False, engine=engine, record_trace=record_trace
+    )
+    return scheduler.get_metrics()
+
+
+def stored_files(directory) -> list:
+    return sorted(name for name in os.listdir(directory) if name.endswith(".npz"))
+
+
+def test_hit_returns_the_metrics_and_trace_of_a_fresh_run(tmp_path, monkeypatch):
+    result_cache = ResultCache(str(tmp_path))
+    fresh = RoundRobin(5)
+    metrics = run(result_cache, fresh)
+    assert len(stored_files(tmp_path)) == 1
+
+    def fail(*args, **kwargs):
+        raise AssertionError("A cached result must not be scheduled again")
+
+    monkeypatch.setattr(RoundRobin, "run", fail)
+    cached = RoundRobin(5)
+    assert run(result_cache, cached) == metrics
+    for column, fresh_column in zip(cached.get_trace(), fresh.get_trace()):
+        np.testing.assert_array_equal(column, fresh_column)
+    assert cached.get_steps() == fresh.get_steps()
+
+
+def test_other_parameters_and_engine_versions_miss(tmp_path, monkeypatch):
+    result_cache = ResultCache(str(tmp_path))
+    key = result_cache.key(RoundRobin(5), WORKLOAD, "event")
+    result_cache.put(key, {"context_switches": 1})
+    assert result_cache.get(key) is not None
+
+    assert result_cache.key(RoundRobin(50), WORKLOAD, "event") != key
+    assert result_cache.key(RoundRobin(5), WORKLOAD, "reference") != key
+    assert result_cache.key(RoundRobin(5), WORKLOAD[:-1], "event") != key
+    monkeypatch.setattr(cache_module, "ENGINE_VERSION", cache_module.ENGINE_VERSION + 1)
+    assert result_cache.key(RoundRobin(5), WORKLOAD, "event") != key
+
+    # A different quantum is scheduled instead of taken from the cache
+    monkeypatch.undo()
+    assert run(result_cache, RoundRobin(50)) == run(None, RoundRobin(50))
+
+
+def test_numpy_parameters_are_keyed_by_value(tmp_path):
+    result_cache = ResultCache(str(tmp_path))
+    key = result_cache.key(RoundRobin(np.int64(5)), WORKLOAD, "event")
+    assert key == result_cache.key(RoundRobin(5), WORKLOAD, "event")
+    assert key != result_cache.key(RoundRobin(np.int64(50)), WORKLOAD, "event")
+
+
+def test_a_run_without_trace_does_not_serve_one_with_trace(tmp_path):
+    result_cache = ResultCache(str(tmp_path))
+    run(result_cache, RoundRobin(5), record_trace=False)
+    algorithm = RoundRobin(5)
+    run(result_cache, algorithm)
+    assert algorithm.get_steps()
+
+
+def test_least_recently_used_results_are_evicted(tmp_path):
+    result_cache = ResultCache(str(tmp_path))
+    for name in ("a", "b", "c"):
+        result_cache.put(name, {"value": 1})
+    # Oldest use first: a, b, c, then a is used again
+    for age, name in enumerate(("a", "b", "c")):
+        os.utime(tmp_path / f"{name}.npz", (1000 + age, 1000 + age))
+    assert result_cache.get("a") is not None
+
+    size = os.path.getsize(tmp_path / "a.npz")
+    result_cache.evict(max_size=2 * size)
+    assert stored_files(tmp_path) == ["a.npz", "c.npz"]
+
+    result_cache.clear()
+    assert stored_files(tmp_path) == []
+
+
+def test_put_evicts_beyond_max_size(tmp_path):
+    result_cache = ResultCache(str(tmp_path), max_size=1)
+    result_cache.put("a", {"value": 1})
+    assert stored_files(tmp_path) == []
+
+
+def test_directory_is_created_by_the_first_result(tmp_path):
+    directory = tmp_path / "results"
+    result_cache = ResultCache(str(directory))
+    assert result_cache.get("a") is None
+    assert not directory.exists()
+    run(result_cache, RoundRobin(5))
+    assert len(stored_files(directory)) == 1
+
+
+def test_algorithms_without_their_parameters_run_uncached(tmp_path):
+    class Renamed(RoundRobin):
+        def __init__(self, slice_length):
+            super().__init__(slice_length)
+
+    result_cache = ResultCache(str(tmp_path))
+    assert run(result_cache, Renamed(5)) == run(None, RoundRobin(5))
+    assert stored_files(tmp_path) == []
+
+
+def test_environment_variable_selects_or_disables_the_default_cache(
+    tmp_path, monkeypatch
+):
+    monkeypatch.setenv("OS_SCHEDULING_CACHE", "")
+    assert default_cache() is None
+    assert Scheduler().cache is None
+
+    monkeypatch.setenv("OS_SCHEDULING_CACHE", str(tmp_path))
+    assert default_cache().directory == str(tmp_path)
+    assert Scheduler().cache is default_cache()
@@ -0,0 +1,211 @@
+"""
+The fast engines, prefix runs, incremental runs and busy period runs must give exactly
+the schedule of the reference loops, so they are compared on small random workloads.
+"""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("manim")  # src.algorithms imports it for the animations
+
+from src.algorithms import (
+    FirstComeFirstServe,
+    MultiLevelQueue,
+    RoundRobin,
+    Scheduler,
+)
+from src.busy_periods import run_busy_periods
+from src.incremental import IncrementalRun
+from src.metrics import StreamingMetrics
+from src.streaming import replay
+from src.workload import ProcessTable, generate_io_bursts, generate_workload
+
+# Algorithms with their fast engines, each with and without a context switch cost
+ALGORITHMS = [
+    (lambda switch_cost: FirstComeFirstServe(switch_cost), ["vectorized", "io"]),
+    (lambda switch_cost: RoundRobin(3, switch_cost), ["event", "io"]),
+    (lambda switch_cost: MultiLevelQueue(2, switch_cost), ["event", "io"]),
+]
+SWITCH_COSTS = [0, 2]
+SEEDS = range(20)
+
+# Exact for the whole schedule, the spread and percentiles may differ in rounding
+EXACT_METRICS = {
+    "average_wait_time",
+    "average_turnaround_time",
+    "throughput",
+    "fairness_index",
+    "context_switches",
+    "cpu_efficiency",
+    "average_io_wait_time",
+}
+
+
+def random_workload(seed: int, sort: bool, num_processes: int = 60) -> ProcessTable:
+    # Unsorted workloads move processes by up to a few arrivals out of order
+    workload = generate_workload(
+        num_processes,
+        mean_burst_time=15,
+        std_dev_burst=15,
+        arrival_time_variation=2,
+        seed=seed,
+    )
+    keys = workload.arrival_times
+    if not sort:
+        keys = keys + np.random.default_rng(seed).integers(0, 60, num_processes)
+    order = np.argsort(keys, kind="stable")
+    return ProcessTable(
+        np.arange(1, num_processes + 1),  # The reference loops index by id
+        workload.arrival_times[order],
+        workload.burst_times[order],
+        workload.priorities[order],
+    )
+
+
+def edited_workloads(workload: ProcessTable, seed: int):
+    """The workload after a series of edits: a burst, an arrival, appending, cutting"""
+    rng = np.random.default_rng(seed)
+    ids, arrival_times, burst_times, priorities = (
+        workload.ids.copy(),
+        workload.arrival_times.copy(),
+        workload.burst_times.copy(),
+        workload.priorities.copy(),
+    )
+
+    burst_times[rng.integers(len(ids))] += 5
+    yield ProcessTable(ids, arrival_times, burst_times, priorities)
+
+    row = rng.integers(len(ids))
+    arrival_times[row] = max(arrival_times[row] - 10, 0)
+    yield ProcessTable(ids, arrival_times, burst_times, priorities)
+
+    extra = random_workload(seed + 1000, sort=True, num_processes=10)
+    ids = np.concatenate([ids, extra.ids + len(ids)])
+    arrival_times = np.concatenate(
+        [arrival_times, extra.arrival_times + arrival_times.max()]
+    )
+    burst_times = np.concatenate([burst_times, extra.burst_times])
+    priorities = np.concatenate([priorities, extra.priorities])
+    yield ProcessTable(ids, arrival_times, burst_times, priorities)
+
+    yield ProcessTable(
+        ids[:-25], arrival_times[:-25], burst_times[:-25], priorities[:-25]
+    )
+
+
+def schedule(algorithm, processes, engine: str):
+    scheduler = Scheduler()
+    scheduler.cache = None
+    scheduler.set_processes(processes)
+    scheduler.run_algorithm(algorithm, display=False, engine=engine)
+    return scheduler.get_metrics(), algorithm.get_steps()
+
+
+def assert_same_metrics(metrics: dict, expected: dict) -> None:
+    assert metrics.keys() == expected.keys()
+    for name, value in metrics.items():
+        if name in EXACT_METRICS:
+            assert value == expected[name], name
+        else:
+            assert value == pytest.approx(expected[name], rel=1e-9, abs=1e-9), name
+
+
+def assert_same_run(result, expected) -> None:
+    context_switches, current_time, wait_times = result
+    assert (context_switches, current_time) == tuple(expected[:2])
+    np.testing.assert_array_equal(wait_times, expected[2])
+
+
+@pytest.mark.parametrize("sort", [True, False])
+@pytest.mark.parametrize("switch_cost", SWITCH_COSTS)
+@pytest.mark.parametrize("make, engines", ALGORITHMS)
+def test_engines_match_reference(make, engines, switch_cost, sort):
+    for seed in SEEDS:
+        workload = random_workload(seed, sort)
+        expected_metrics, expected_steps = schedule(
+            make(switch_cost), workload, "reference"
+        )
+        for engine in engines:
+            metrics, steps = schedule(make(switch_cost), workload, engine)
+            assert_same_metrics(metrics, expected_metrics)
+            assert steps == expected_steps, (seed, engine)
+
+
+@pytest.mark.parametrize("switch_cost", SWITCH_COSTS)
+@pytest.mark.parametrize("make, engines", ALGORITHMS)
+def test_run_prefixes_match_reference(make, engines, switch_cost):
+    sizes = [0, 1, 7, 30, 59, 60]
+    for seed in SEEDS:
+        workload = random_workload(seed, sort=seed % 2 == 0)
+        results = list(make(switch_cost).run_prefixes(workload, sizes))
+        assert len(results) == len(sizes)
+        for size, result in zip(sizes[1:], results[1:]):
+            expected = make(switch_cost).run(workload[:size], record_trace=False)
+            assert_same_run(result, expected)
+
+
+@pytest.mark.parametrize("switch_cost", SWITCH_COSTS)
+@pytest.mark.parametrize("make, engines", ALGORITHMS)
+def test_incremental_run_after_edits(make, engines, switch_cost):
+    for seed in SEEDS:
+        algorithm = make(switch_cost)
+        run = IncrementalRun(algorithm, interval=8, max_checkpoints=3)
+        workload = random_workload(seed, sort=seed % 2 == 0)
+        for edited in [workload, *edited_workloads(workload, seed)]:
+            result = run.run(edited)
+            reference = make(switch_cost)
+            assert_same_run(result, reference.run(edited))
+            assert algorithm.get_steps() == reference.get_steps(), seed
+
+
+@pytest.mark.parametrize("engine", ["reference", None])
+@pytest.mark.parametrize("switch_cost", SWITCH_COSTS)
+@pytest.mark.parametrize("make, engines", ALGORITHMS)
+def test_busy_periods_match_full_run(make, engines, switch_cost, engine):
+    for seed in SEEDS:
+        workload = random_workload(seed, sort=seed % 2 == 0, num_processes=200)
+        algorithm = make(switch_cost)
+        result = run_busy_periods(algorithm, workload, engine=engine, group_size=16)
+        reference = make(switch_cost)
+        assert_same_run(result, reference.run(workload))
+        assert algorithm.get_steps() == reference.get_steps(), seed
+
+
+@pytest.mark.parametrize("make, engines", ALGORITHMS)
+def test_io_bursts_need_the_io_engine(make, engines):
+    workload = generate_io_bursts(random_workload(0, sort=True), seed=0)
+    for engine in ["reference", *engines]:
+        if engine != "io":
+            with pytest.raises(ValueError):
+                make(0).run(workload, engine=engine)
+    with pytest.raises(ValueError):
+        IncrementalRun(make(0)).run(workload)
+    with pytest.raises(ValueError):
+        list(replay(make(0), [workload[:30], workload[30:]]))
+
+    algorithm = make(0)
+    assert algorithm.engine_for(workload) == "io"
+    assert_same_run(
+        run_busy_periods(algorithm, workload), make(0).run(workload, engine="io")
+    )
+
+
+def test_busy_period_cache_keeps_configurations_apart():
+    workload = random_workload(0, sort=True, num_processes=200)
+    cache = {}
+    for quantum in [2, 20, 2]:
+        result = run_busy_periods(
+            RoundRobin(quantum), workload, cache=cache, group_size=16
+        )
+        assert_same_run(result, RoundRobin(quantum).run(workload))
+
+
+@pytest.mark.parametrize("make, engines", ALGORITHMS)
+def test_run_prefixes_statistics(make, engines):
+    sizes = [5, 30, 60]
+    workload = random_workload(1, sort=False)
+    results = make(2).run_prefixes(workload, sizes, statistics=True)
+    for size, (*result, statistics) in zip(sizes, results):
+        expected = StreamingMetrics()
+        assert_same_run(result, make(2).run(workload[:size], sink=expected))
+        assert_same_metrics(statistics.statistics(), expected.statistics())
@@ -0,0 +1,84 @@
+"""
+SymmetricMultiprocessing lets a CPU keep its process for several quanta at once, which
+must give the same schedule as ending every quantum on its own.
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+pytest.importorskip("manim")  # src.algorithms imports it for the animations
+
+from src.smp import SymmetricMultiprocessing
+from src.workload import generate_workload
+
+SEEDS = range(60)
+
+
+def random_workload(seed: int):
+    rng = random.Random(seed)
+    return generate_workload(
+        rng.randint(1, 80),
+        mean_burst_time=rng.choice([5, 20, 60]),
+        std_dev_burst=20,
+        arrival_time_variation=rng.choice([0.5, 1, 2, 4, 8]),
+        seed=seed,
+    )
+
+
+def schedule(algorithm, workload) -> tuple:
+    context_switches, current_time, wait_times = algorithm.run(workload)
+    cpu_metrics = algorithm.get_cpu_metrics()
+    return (
+        context_switches,
+        current_time,
+        wait_times.tolist(),
+        algorithm.get_steps(),
+        cpu_metrics["utilization"].tolist(),
+        cpu_metrics["overhead_times"].tolist(),
+        cpu_metrics["context_switches"].tolist(),
+        cpu_metrics["migrations"],
+    )
+
+
+@pytest.mark.parametrize("migration_cost", [0, 3])
+@pytest.mark.parametrize("switch_cost", [0, 2])
+@pytest.mark.parametrize("balancer", ["global", "stealing"])
+def test_batched_quanta_match_single_quanta(balancer, switch_cost, migration_cost):
+    for seed in SEEDS:
+        rng = random.Random(seed)
+        num_cpus = rng.randint(1, 6)
+        quantum = rng.choice([1, 2, 3, 5])
+        workload = random_workload(seed)
+
+        def make(batch_quanta: bool) -> SymmetricMultiprocessing:
+            algorithm = SymmetricMultiprocessing(
+                num_cpus, quantum, balancer, switch_cost, migration_cost
+            )
+            algorithm.batch_quanta = batch_quanta
+            return algorithm
+
+        assert schedule(make(True), workload) == schedule(make(False), workload), seed
+
+
+@pytest.mark.parametrize("balancer", ["global", "stealing"])
+def test_steps_cover_every_burst(balancer):
+    for seed in SEEDS:
+        workload = random_workload(seed)
+        algorithm = SymmetricMultiprocessing(3, 4, balancer, switch_cost=1)
+        algorithm.run(workload)
+
+        run_times = {}
+        for step in algorithm.get_steps():
+            if step["id"] > 0:
+                row = step["id"] - 1
+                assert step["start"] >= workload.arrival_times[row]
+                run_times[row] = run_times.get(row, 0) + step["size"]
+        assert run_times == dict(enumerate(workload.burst_times.tolist()))
+
+        # A CPU runs one step at a time
+        for cpu in range(3):
+            steps = algorithm.get_cpu_steps(cpu)
+            ends = [step["start"] + step["size"] for step in steps[:-1]]
+            assert all(end <= step["start"] for end, step in zip(ends, steps[1:]))